@@ -1,5 +1,9 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
 from starlette.responses import RedirectResponse
+import asyncio
+import os
 import uvicorn
 from src.routes.auth import router as auth_router
 from src.routes.verify_email import router as verify_router
@@ -7,23 +11,85 @@ from src.routes.profile import router as profile_router
 from src.routes.feed import router as feed_router
 from src.routes.interaction import router as log_router
 from src.routes.quest import router as quest_router
+from src.routes.jobs import router as jobs_router
+from src.services.mpad import run_profile_compaction
+from src.services.hook_catalog import hook_catalog
+from src.services.time_decay import run_popularity_schedule
+from src.services.trending import trending_leaderboard
+from src.services.interaction_buffer import interaction_buffer
+from src.services.interaction_store import schedule_interaction_migration
+from src.services.search_cache import search_cache
+from src.services.llm import llm_clients
+from src.services.job_queue import job_queue
+from src.services.perplexity import structured_output_stats
+from src.services.image_pipeline import image_pipeline, schedule_image_migration
+from src.services.image_index import image_index
+from src.services.user_cache import user_cache
+from src.utils.security import password_hasher
+from src.config.common_setting import settings
+from src.database.indexes import ensure_indexes
+from src.database.mongo import mongo, pool_stats
+from src.database.s3 import s3_client
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    mongo.connect()
+    llm_clients.start()
+    await ensure_indexes()
+    await search_cache.load()
+    await hook_catalog.start()
+    await trending_leaderboard.start()
+    await interaction_buffer.start()
+    await job_queue.start()
+    await schedule_interaction_migration()
+    await schedule_image_migration()
+    background_tasks = [
+        asyncio.create_task(run_profile_compaction()),
+        asyncio.create_task(run_popularity_schedule()),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await job_queue.stop()
+    await interaction_buffer.stop()
+    await hook_catalog.stop()
+    password_hasher.shutdown()
+    image_pipeline.shutdown()
+    s3_client.close()
+    mongo.close()
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/health", include_in_schema=False)
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return {
+        "password_hashing": password_hasher.metrics(),
+        "structured_output": dict(structured_output_stats),
+        "images": image_index.metrics(),
+        "mongo_pool": pool_stats.snapshot(),
+        "user_cache": user_cache.metrics(),
+    }
+
 @app.get("/", tags=["default"])
 async def index():
     return RedirectResponse(url="/docs")
 
+if settings.IMAGE_STORE_BACKEND == "filesystem":
+    os.makedirs(settings.IMAGE_STORE_DIR, exist_ok=True)
+    app.mount(settings.IMAGE_STORE_BASE_URL, StaticFiles(directory=settings.IMAGE_STORE_DIR), name="images")
+
 app.include_router(auth_router, prefix="/api/auth", tags=["authentication"])
 app.include_router(verify_router, prefix="/api/auth", tags=["email verification"])
 app.include_router(profile_router, prefix="/api/profile", tags=["profile updates"])
 app.include_router(feed_router, prefix="/api/feed", tags=["feed"])
 app.include_router(log_router, prefix="/api/interaction", tags=["user interaction"])
 app.include_router(quest_router, prefix="/api/quest", tags=['gamification'])
+app.include_router(jobs_router, prefix="/api/jobs", tags=["jobs"])
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, proxy_headers=True)#hm
\ No newline at end of file
@@ -10,6 +10,21 @@ class Settings(BaseSettings):
     S3_BUCKET_NAME: str
     AWS_REGION: str
     ENVIRONMENT: str = "development"
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 10000  # fail a request instead of queueing forever for a connection
+    MONGO_FEED_READ_PREFERENCE: str = "secondaryPreferred"  # feed and trending reads
+    S3_MAX_POOL_CONNECTIONS: int = 16
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    IMAGE_STORE_BACKEND: str = "s3"  # "s3" or "filesystem"
+    IMAGE_STORE_DIR: str = "images"
+    IMAGE_STORE_BASE_URL: str = "/images"
+    IMAGE_FORMAT: str = "WEBP"  # "WEBP" or "AVIF" (needs Pillow built with libavif)
+    USER_CACHE_SHARED_BACKEND: str = "none"  # "none" or "memory" (in-process only, for tests and local runs)
+    JOB_WORKERS: int = 2  # background job coroutines per process
+    IMAGE_PROMPT_REUSE: bool = False  # reuse the render of an equivalent img_desc instead of calling Gemini
 
     model_config = SettingsConfigDict(env_file=".env") 
 
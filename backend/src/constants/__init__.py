@@ -14,8 +14,31 @@ TEMPERATURE = 1
 
 IMAGE_MODEL_NAME = "models/gemini-2.0-flash-preview-image-generation"
 
+LLM_CONCURRENCY = {  # in-flight calls allowed per provider
+    "perplexity": 8,
+    "gemini": 4,
+}
+LLM_TIMEOUT = {  # seconds before a single provider call is abandoned
+    "perplexity": 60,
+    "gemini": 90,
+}
+LLM_MAX_RETRIES = 3
+LLM_RETRY_BASE_DELAY = 1.0  # seconds, doubled per attempt with full jitter
+
 TOPICS = ["history", "art"]
 
+HOOK_GENERATION_CONCURRENCY = 4  # topics generated at the same time per request
+S3_UPLOAD_CONCURRENCY = 8  # uploads running at the same time across all requests
+
+IMAGE_ASPECT_RATIO = 16 / 9
+IMAGE_RENDITIONS = {  # name -> (max width in px, encoder quality)
+    "thumb": (320, 60),
+    "feed": (768, 75),
+    "full": (1600, 82),
+}
+IMAGE_DEFAULT_RENDITION = "feed"  # rendition exposed as the hook's image_url
+IMAGE_PROCESS_WORKERS = 2  # processes decoding/encoding images off the event loop
+
 INTERACTION_WEIGHTS = {
     "clicks": 1.0,
     "likes": 2.0,
@@ -23,7 +46,19 @@ INTERACTION_WEIGHTS = {
     "shares": 2.5,
     "duration": 0.05,
 }
+INTERACTION_BUCKET_SECONDS = 24 * 60 * 60  # time window covered by one interaction bucket document
+INTERACTION_BUCKET_SIZE = 200  # events per bucket before a new bucket is started
+INTERACTION_FLUSH_INTERVAL = 2  # seconds events are coalesced before being written
+INTERACTION_BUFFER_MAX_EVENTS = 1000  # buffered events that force an early flush
+QUIZ_INTERACTION_WINDOW = 200  # most recent interactions considered when picking quiz hooks
+
+QUIZ_PROMPT_VERSION = 1  # bump when QUIZ_SYSTEM_MESSAGE or the quiz schema changes
+QUIZ_CACHE_SIZE = 5000  # quizzes kept in memory
+QUIZ_REFRESH_AGE = 30 * 24 * 60 * 60  # seconds before a stored quiz is regenerated in the background
+
 DECAY_LAMBDA = 0.1
+PROFILE_COMPACTION_INTERVAL = 6 * 60 * 60  # seconds between interest vector decay passes
+PROFILE_MIN_SCORE = 1e-3  # tags decayed below this are dropped from the interest vector
 WEIGHTS = {
     "base_score": 0.5,
     "recency": 0.2,
@@ -36,6 +71,10 @@ CANDIDATE_POOL_FACTOR = 3
 TIME_DECAY_LAMBDA = 0.15
 
 SEARCH_TEMPERATURE = 1.8
+SEARCH_CACHE_FRESHNESS = 24 * 60 * 60  # seconds a generated search hook may be reused
+SEARCH_CACHE_SIZE = 10000  # normalized queries kept for near-duplicate matching
+SEARCH_SIMILARITY_THRESHOLD = 0.8  # trigram Jaccard needed to treat two queries as the same search
+SEARCH_CACHE_VARIANTS = 5  # most recent matching hooks one is picked from
 
 POPULARITY_WEIGHTS = {
     "viewCount": 0.1,
@@ -43,8 +82,28 @@ POPULARITY_WEIGHTS = {
     "saveCount": 0.8,
     "shareCount": 1.0,
 }
+POPULARITY_BATCH_SIZE = 1000  # hooks per bulk_write during popularity recompute
+POPULARITY_REFRESH_INTERVAL = 60 * 60  # seconds between scheduled popularity recomputes
 
 NUMBER_OF_TRENDING_HOOKS = 6
+FEED_PAGE_SIZE = 20  # hooks per page of the personalized feed
+FEED_MAX_PAGE_SIZE = 100
+TRENDING_MAX_N = 100  # largest N served from the trending leaderboard
+TRENDING_TTL = 5 * 60  # seconds before the leaderboard snapshot is refreshed in the background
+
+HOOK_CATALOG_MAX_SIZE = 50000  # hooks kept in the in-process catalog before LRU eviction
+HOOK_CATALOG_POLL_INTERVAL = 30  # seconds, used when change streams are unavailable
+HOOK_CATALOG_MAX_BACKOFF = 5 * 60  # seconds, longest wait between failed catalog reloads
+
+TOKEN_CACHE_SIZE = 10000  # verified JWT claims kept per process, each until its exp
+USER_CACHE_SIZE = 10000  # user and interest-profile documents kept per process
+USER_CACHE_TTL = 5 * 60  # seconds, bounds staleness after writes made by other processes
+PROFILE_CACHE_TTL = 60  # seconds, interest vectors also change on every interaction flush
+
+JOB_MAX_ATTEMPTS = 3  # runs per job before it is marked failed
+JOB_RETRY_BASE_DELAY = 5  # seconds, doubled after every failed attempt
+JOB_POLL_INTERVAL = 5  # seconds an idle worker waits before checking for new jobs
+JOB_LEASE_SECONDS = 10 * 60  # a running job not heard from for this long is picked up again
 
 SYSTEM_MESSAGES = {
     "history": """You are an AI feed generator for a history-themed platform. Generate short, emoji-rich feed messages from historical events, user progress, or curated content. Be informative, dramatic, and curiosity-driven. Focus on milestones, surprises, or anniversaries. ⚔️, 👑, 📜, 🕰️ allowed. Strict 60-word max message format. Ex: “📜 You unlocked ‘Age of Empires’ — Renaissance insights await!”""",
@@ -0,0 +1,127 @@
+"""Index registry: every index the app's queries rely on, declared per collection.
+
+`ensure_indexes` creates them idempotently at startup. `verify_hot_queries` runs
+explain() on the hot queries and reports whether each winning plan is index-backed;
+run `python -m src.database.indexes` to check a live database."""
+import asyncio
+from datetime import datetime, timezone
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import ConnectionFailure, OperationFailure
+from src.database.mongo import db
+from src import logger
+
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)]),
+        IndexModel([("username", ASCENDING)]),
+    ],
+    "hooks": [
+        IndexModel([("tags", ASCENDING), ("metadata.popularity", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("metadata.popularity", DESCENDING)]),
+        IndexModel([("search.query", ASCENDING), ("search.createdAt", DESCENDING)], sparse=True),
+    ],
+    "interaction_buckets": [
+        IndexModel([("user_id", ASCENDING), ("bucket_start", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("last_ts", DESCENDING)]),
+    ],
+    "profile": [
+        # one profile per user: concurrent first upserts from several workers then
+        # collide on this key and the server retries the losing one as an update
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+    "quizzes": [
+        IndexModel([("hook_id", ASCENDING), ("prompt_version", ASCENDING)], unique=True),
+    ],
+    "jobs": [
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)]),
+        IndexModel([("kind", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("idempotency_key", ASCENDING)], unique=True,
+                   partialFilterExpression={"idempotency_key": {"$exists": True}}),
+        IndexModel([("active_key", ASCENDING)], unique=True,
+                   partialFilterExpression={"active_key": {"$exists": True}}),
+    ],
+}
+
+# name -> (collection, filter, sort) for the queries behind the busiest routes
+HOT_QUERIES = {
+    "register_user": ("users", {"$or": [{"username": "probe"}, {"email": "probe"}]}, None),
+    "login_user": ("users", {"email": "probe"}, None),
+    "personal_feed": ("hooks", {"tags": {"$in": ["probe"]}},
+                      [("metadata.popularity", DESCENDING), ("_id", DESCENDING)]),
+    "trending": ("hooks", {}, [("metadata.popularity", DESCENDING)]),
+    "search_cache": ("hooks", {"search.query": {"$in": ["probe"]}, "search.createdAt": {"$gte": datetime(1970, 1, 1)}},
+                     [("search.createdAt", DESCENDING)]),
+    "recent_interactions": ("interaction_buckets", {"user_id": "probe"}, [("last_ts", DESCENDING)]),
+    "append_interactions": ("interaction_buckets", {"user_id": "probe", "bucket_start": datetime(1970, 1, 1)}, None),
+    "profile": ("profile", {"user_id": "probe"}, None),
+    "quiz": ("quizzes", {"hook_id": "probe", "prompt_version": 1}, None),
+    "job_claim": ("jobs", {"status": "queued", "run_at": {"$lte": datetime(1970, 1, 1, tzinfo=timezone.utc)}},
+                  [("run_at", ASCENDING)]),
+}
+
+INDEX_STAGES = {"IXSCAN", "IDHACK", "EXPRESS_IXSCAN", "EXPRESS_IDHACK"}
+
+
+async def ensure_indexes(database=db, indexes=INDEXES):
+    """Creates every registered index. Existing indexes are left as they are.
+
+    A conflicting definition or duplicate data (OperationFailure) is logged and the
+    remaining collections are still indexed, since the app works without the index.
+    An unreachable server (ConnectionFailure) aborts startup: nothing else would work."""
+    for name, models in indexes.items():
+        try:
+            await database[name].create_indexes(models)
+        except OperationFailure as e:
+            logger.error(f"Failed to create indexes on {name}: {e}")
+        except ConnectionFailure:
+            logger.critical("MongoDB is unreachable, cannot ensure indexes")
+            raise
+
+
+def plan_stages(plan) -> set:
+    """Every stage name in an explain() winning plan, classic or slot-based engine"""
+    stages = set()
+    nodes = [plan.get("queryPlanner", plan).get("winningPlan", {})]
+    while nodes:
+        node = nodes.pop()
+        if "queryPlan" in node:
+            node = node["queryPlan"]
+        if "stage" in node:
+            stages.add(node["stage"])
+        if "inputStage" in node:
+            nodes.append(node["inputStage"])
+        nodes.extend(node.get("inputStages", []))
+    return stages
+
+
+def is_index_backed(plan) -> bool:
+    stages = plan_stages(plan)
+    return "COLLSCAN" not in stages and bool(stages & INDEX_STAGES)
+
+
+async def explain(database, collection, query, sort=None):
+    cursor = database[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    return await cursor.explain()
+
+
+async def verify_hot_queries(database=db, queries=HOT_QUERIES):
+    """Returns {query name: True if its winning plan uses an index}"""
+    results = {}
+    for name, (collection, query, sort) in queries.items():
+        plan = await explain(database, collection, query, sort)
+        results[name] = is_index_backed(plan)
+        if not results[name]:
+            logger.warning(f"Query '{name}' on {collection} is not index-backed: {sorted(plan_stages(plan))}")
+    return results
+
+
+async def main():
+    await ensure_indexes()
+    for name, backed in (await verify_hot_queries()).items():
+        print(f"{'IXSCAN' if backed else 'COLLSCAN':8} {name}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,169 @@
+import threading
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference, monitoring
 from src.config.common_setting import settings
 from src.constants import DATABASE_NAME
 
-client = AsyncIOMotorClient(settings.MONGO_DB_URI)
-db = client[DATABASE_NAME]
-users_collection = db["users"]
-hooks_collection = db["hooks"]
-log_collection = db["interactions"]
-profile_collection = db["profile"]
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters, fed by the driver's CMAP events from its worker threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.in_use = 0
+            self.waiting = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.max_waiting = 0
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def _waited(self, event):
+        duration = getattr(event, "duration", None) or 0.0
+        with self._lock:
+            self.total_wait += duration
+            self.max_wait = max(self.max_wait, duration)
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+
+    def connection_created(self, event):
+        self._count(open=1)
+
+    def connection_closed(self, event):
+        self._count(open=-1)
+
+    def connection_check_out_started(self, event):
+        self._count(waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._count(waiting=-1, checkout_failures=1)
+        self._waited(event)
+
+    def connection_checked_out(self, event):
+        self._count(waiting=-1, in_use=1, checkouts=1)
+        self._waited(event)
+
+    def connection_checked_in(self, event):
+        self._count(in_use=-1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+                "open": self.open,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": round(1000 * self.total_wait / self.checkouts, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(1000 * self.max_wait, 2),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class Mongo:
+    """Owns the Motor client. `connect` and `close` run in the app lifespan; anything
+    that touches the database first (scripts, tests) connects lazily."""
+
+    def __init__(self, uri=settings.MONGO_DB_URI, name=DATABASE_NAME):
+        self.uri = uri
+        self.name = name
+        self._client = None
+
+    def connect(self):
+        if self._client is None:
+            self._client = AsyncIOMotorClient(
+                self.uri,
+                maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                event_listeners=[pool_stats],
+            )
+        return self._client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            pool_stats.reset()
+
+    @property
+    def client(self):
+        return self.connect()
+
+    @property
+    def db(self):
+        return self.client[self.name]
+
+
+mongo = Mongo()
+
+
+class CollectionProxy:
+    """Module-level handle resolving to the collection on the current client, so
+    `from src.database.mongo import hooks_collection` keeps working across connect/close"""
+
+    def __init__(self, name, read_preference=None):
+        self._name = name
+        self._read_preference = read_preference
+        self._client = None
+        self._collection = None
+
+    def _resolve(self):
+        client = mongo.client
+        if self._client is not client:
+            collection = client[mongo.name][self._name]
+            if self._read_preference is not None:
+                collection = collection.with_options(read_preference=self._read_preference)
+            self._client, self._collection = client, collection
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+
+class DatabaseProxy:
+    def __getitem__(self, name):
+        return mongo.db[name]
+
+    def __getattr__(self, attr):
+        return getattr(mongo.db, attr)
+
+
+db = DatabaseProxy()
+users_collection = CollectionProxy("users")
+hooks_collection = CollectionProxy("hooks")
+# read-heavy feed queries tolerate replication lag, so they may be served by secondaries
+hooks_feed_collection = CollectionProxy("hooks", read_preference=READ_PREFERENCES[settings.MONGO_FEED_READ_PREFERENCE])
+log_collection = CollectionProxy("interactions")
+interaction_bucket_collection = CollectionProxy("interaction_buckets")
+profile_collection = CollectionProxy("profile")
+quiz_collection = CollectionProxy("quizzes")
+image_index_collection = CollectionProxy("image_index")
+job_collection = CollectionProxy("jobs")
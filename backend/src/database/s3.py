@@ -1,7 +1,14 @@
 import os
 import boto3
+from botocore.config import Config
+from src.config.common_setting import settings
 
 aws_region = os.getenv("AWS_REGION")
 s3_bucket = os.getenv("S3_BUCKET_NAME")
 
-s3_client = boto3.client("s3", region_name=aws_region)
+# every concurrent upload holds one pooled connection
+s3_client = boto3.client(
+    "s3",
+    region_name=aws_region,
+    config=Config(max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS, retries={"mode": "standard"})
+)
@@ -1,144 +1,58 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pathlib import Path
-from src.config.common_setting import settings
 import json 
-import base64
-from src.database.s3 import s3_client
 from dotenv import load_dotenv
-from bson import ObjectId
-from pymongo import DESCENDING
 from pymongo.errors import PyMongoError
-from src.constants import SEARCH_TEMPERATURE, NUMBER_OF_TRENDING_HOOKS
+from src.constants import NUMBER_OF_TRENDING_HOOKS, FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE
 from src.schemas.quiz_schemas import QuizResponse, MCQ
-from src.config.game import SEARCH_XP
-from src.services.game import update_xp
-from src.services.game import generate_quiz
-from typing import List
-from src.database.mongo import hooks_collection, users_collection
-from src.utils.common import load_json
-from src.constants import SCHEMA_DIR, SYSTEM_MESSAGES, N_VALUE
+from typing import List, Optional
+from src.constants import SYSTEM_MESSAGES, N_VALUE
 from src.schemas.pplx_schemas import FeedResponse, TopicRequest, HookResponse
-from src.services.mpad import update_profile
 from src.constants import TOPICS 
-from src.services.perplexity import PPLX
-from src.services.gemini import GEMINI
 from src.services.mpad import generate_mpad_feed
+from src.services.user_cache import user_cache
+from src.services.feed_pagination import decode_cursor, stream_feed_page
+from src.services.job_queue import job_queue
+import src.services.hook_generation  # registers the generate_hooks job
+from src.services.trending import trending_leaderboard
+from src.services.search import search_events, search_hook as run_search
 from pydantic import BaseModel, Field
-from datetime import datetime, timezone
 from src import logger
 import asyncio
-import random
-from io import BytesIO
-import uuid
 load_dotenv()
 
 router = APIRouter()
 
-@router.post("/hook", response_model=HookResponse)
-async def generate_hook(request: TopicRequest):
-    try:
-        topics = request.topics
-        logger.info("Starting hook generation for topics: %s", topics)
-        feed_validation_filepath: Path = SCHEMA_DIR / "feed_response.json"
-        feed_validation_schema = load_json(feed_validation_filepath)
-
-        pplx = PPLX()
-        gemini = GEMINI()
-        feed = []
-
-        for topic in topics:
-            logger.debug("Generating hook for topic: %s", topic)
-            try:
-                pplx.set_template(system_msg=SYSTEM_MESSAGES[topic])
-                hook = pplx.get_prompt(schema=feed_validation_schema, input=f"Generate a hook on the topic, {topic}")
-
-                if "category" not in hook:
-                    hook["category"] = topic.capitalize()
-
-                image_prompt = hook.get('img_desc')
-                if image_prompt:
-                    try:
-                        image_base64 = gemini.get_image(input=image_prompt)
-                        if not image_base64:
-                            raise ValueError("Empty image returned from Gemini")
-
-                        image_bytes = base64.b64decode(image_base64)
-
-                        file_ext = ".png"
-                        unique_name = f"{uuid.uuid4()}{file_ext}"
-
-                        s3_client.upload_fileobj(
-                            BytesIO(image_bytes),
-                            settings.S3_BUCKET_NAME,
-                            unique_name
-                        )
-
-                        image_url = f"https://{settings.S3_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{unique_name}"
-                        hook["image_url"] = image_url
-
-                    except Exception as img_err:
-                        logger.error(f"Image generation/upload failed for topic {topic}: {img_err}")
-                        hook["image_url"] = None
-
-                hook["metadata"] = {
-                    "createdAt": datetime.now(timezone.utc).isoformat() + "Z",
-                    "popularity": 0,
-                    "saveCount": random.randint(1, 50),
-                    "shareCount": random.randint(1, 100),
-                    "likeCount": random.randint(5, 500),
-                    "viewCount": random.randint(5, 500),
-                    "viral": random.randint(0, 1)
-                }
-
-                feed.append(hook)
-
-                await hooks_collection.insert_one(hook)
-                logger.debug("Inserted hook with topic: %s", topic)
-
-            except KeyError:
-                logger.error("System message not found for topic: %s", topic)
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Unsupported topic: {topic}"
-                )
-            except PyMongoError:
-                logger.exception("Database insertion failed for topic: %s", topic)
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Database insertion error"
-                )
-            except Exception as e:
-                logger.exception(f"Unexpected error for topic {topic}: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to generate hook for topic: {topic}"
-                )
-
-        logger.info("Successfully generated and stored %d hooks", len(feed))
-        return {"status": "feed successfully generated"}
+@router.post("/hook", response_model=HookResponse, status_code=status.HTTP_202_ACCEPTED)
+async def generate_hook(request: TopicRequest, idempotency_key: Optional[str] = Header(None)):
+    topics = request.topics
+    unsupported = [topic for topic in topics if topic not in SYSTEM_MESSAGES]
+    if unsupported:
+        logger.error("System message not found for topics: %s", unsupported)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported topic: {', '.join(unsupported)}"
+        )
 
-    except Exception:
-        logger.exception("Unhandled error in /hook route")
+    try:
+        job = await job_queue.enqueue("generate_hooks", {"topics": topics}, idempotency_key=idempotency_key)
+    except PyMongoError:
+        logger.exception("Failed to queue hook generation for topics: %s", topics)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred while generating hooks"
+            detail="Database insertion error"
         )
-    
 
-@router.post("/trending", response_model=FeedResponse)
-async def get_trending_feed(N:int=NUMBER_OF_TRENDING_HOOKS):
-    try:
-        trending_cursor = hooks_collection.find(
-            {},
-            sort=[("metadata.popularity", DESCENDING)],
-            projection={"image_base64": 0}
-        ).limit(N)
+    logger.info("Queued hook generation job %s for topics: %s", job["_id"], topics)
+    return {"status": job["status"], "job_id": str(job["_id"])}
 
-        trending_hooks = await trending_cursor.to_list(length=N)
-        for hook in trending_hooks:
-            hook["_id"] = str(hook["_id"])
-        return FeedResponse(feed=trending_hooks)
 
+@router.post("/trending", response_model=FeedResponse)
+async def get_trending_feed(request: Request, response: Response, N:int=NUMBER_OF_TRENDING_HOOKS):
+    try:
+        trending_hooks, etag = await trending_leaderboard.get(N)
     except Exception as e:
         logger.exception("Failed to fetch trending feed")
         raise HTTPException(
@@ -146,6 +60,13 @@ async def get_trending_feed(N:int=NUMBER_OF_TRENDING_HOOKS):
             detail="Error while generating trending feed"
         )
 
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return FeedResponse(feed=trending_hooks)
+
 @router.post("/trending/test", response_model=FeedResponse)
 async def get_test_trending_feed():
     try:
@@ -199,66 +120,11 @@ async def get_test_feed():
         )
 
 @router.get("/search/{profile_id}", response_model=FeedResponse)
-async def search_hook(profile_id:str, q: str = Query(..., description="Search query")):
+async def search_hook(profile_id:str, q: str = Query(..., description="Search query"),
+                      fresh: bool = Query(False, description="Generate a new hook instead of reusing a recent one")):
     try:
-        logger.info("Generating a hook for search query: %s", q)
-        validation_filepath: Path = SCHEMA_DIR / "feed_response.json"
-        validation_schema = load_json(validation_filepath)
-
-        pplx = PPLX(temperature=SEARCH_TEMPERATURE)
-        gemini = GEMINI()
-
-        pplx.set_template(system_msg="You are a creative content writer who generates eye-catching, educational hooks based on user input.")
-
-        try:
-            hook = pplx.get_prompt(
-                schema=validation_schema,
-                input=f"Generate a creative and informative hook based on: '{q}'. Give variety from other results."
-            )
-
-            hook["category"] = hook.get("category", "Search")
-            hook["tags"] = [tag.strip().lower() for tag in hook.get("tags", [])] or ["misc"]
-
-            hook["metadata"] = {
-                "createdAt": datetime.now(timezone.utc).isoformat() + "Z",
-                "popularity": 1,
-                "saveCount": random.randint(1, 50),
-                "shareCount": random.randint(1, 100),
-                "likeCount": random.randint(5, 500),
-                "viewCount": random.randint(5, 500),
-                "viral": random.randint(0, 1)
-            }
-
-            image_prompt = hook.get("img_desc")
-            if image_prompt:
-                try:
-                    hook["image_base64"] = gemini.get_image(input=image_prompt)
-                except Exception as img_err:
-                    logger.warning(f"Image generation failed: {img_err}")
-                    hook["image_base64"] = None
-
-            result = await hooks_collection.insert_one(hook)
-            hook["_id"] = str(result.inserted_id)
-
-            try:
-                quiz = generate_quiz(hook)
-                hook["quiz"] = quiz
-            except Exception as quiz_err:
-                logger.warning(f"Quiz generation failed: {quiz_err}")
-                hook["quiz"] = None
-            try:
-                await update_xp(user_id=profile_id, xp=SEARCH_XP)
-            except:
-                logger.error(f"User with {profile_id} had some trouble updating xp")
-        except Exception as sub_error:
-            logger.warning("One of the hooks failed: %s", sub_error)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Hook generation failed"
-            )
-
+        hook = await run_search(profile_id, q, fresh)
         return FeedResponse(feed=[hook])
-
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -269,10 +135,27 @@ async def search_hook(profile_id:str, q: str = Query(..., description="Search qu
         )
 
 
+@router.get("/search/{profile_id}/stream")
+async def stream_search_hook(profile_id:str, q: str = Query(..., description="Search query"),
+                             fresh: bool = Query(False, description="Generate a new hook instead of reusing a recent one")):
+    async def event_stream():
+        try:
+            async for event, payload in search_events(profile_id, q, fresh):
+                yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+        except Exception:
+            logger.exception("Failed to stream search-based hook")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Error generating hooks from search query'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/curated/{profile_id}", response_model=FeedResponse)
 async def generate_curated_feed(profile_id:str, N=N_VALUE):
     try:
-        await update_profile()
         feed = await generate_mpad_feed(user_id=profile_id, N=N_VALUE)
         return FeedResponse(feed=feed)
     except Exception as e:
@@ -280,39 +163,38 @@ async def generate_curated_feed(profile_id:str, N=N_VALUE):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Feed generation failed")
 
 
-@router.get("/{profile_id}", response_model=FeedResponse)
-async def generate_feed(profile_id:str):
+@router.get("/{profile_id}")
+async def generate_feed(
+    profile_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=FEED_MAX_PAGE_SIZE)
+):
+    """Personalized feed ordered by popularity, one page at a time.
+
+    Returns {"feed": [...], "next_cursor": str | null}; pass next_cursor back as
+    `cursor` to fetch the following page."""
     try:
-        current_user = await users_collection.find_one({"_id":ObjectId(profile_id)})
-        if not current_user:
-            logger.exception(f"User with id: {profile_id} does not exist")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User with this username or email does not exist"
-            )
-        if not current_user.get("tags"):
-            user_prefs = {
-                "tags": TOPICS
-            }
-        else:
-            user_prefs = {
-                "tags": current_user.get("tags")
-            }
-    
-        hooks_cursor = hooks_collection.find({"tags": {"$in": user_prefs["tags"]}})
-        hooks = await hooks_cursor.to_list(length=None)
-
-        for hook in hooks:
-            hook["_id"] = str(hook["_id"])
-        
-        return FeedResponse(feed=hooks)
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid feed cursor")
 
-    except Exception as e:
+    try:
+        current_user = await user_cache.get_user(profile_id)
+    except Exception:
         logger.exception("Error generating personalized feed")
         raise HTTPException(
             status_code=500,
             detail="Failed to generate personalized feed"
         )
+    if not current_user:
+        logger.error(f"User with id: {profile_id} does not exist")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this username or email does not exist"
+        )
+
+    tags = current_user.get("tags") or TOPICS
+    return StreamingResponse(stream_feed_page(tags, page_cursor, limit), media_type="application/json")
 
 
 # --- Schema Definitions ---
@@ -1,48 +1,40 @@
 from fastapi import APIRouter, HTTPException, status
-from bson import ObjectId
+from typing import List
 from src.schemas.log_schemas import InteractionLog
-from src.database.mongo import log_collection, hooks_collection
+from src.services.interaction_buffer import interaction_buffer
+from src.services.hook_catalog import hook_catalog
 from dotenv import load_dotenv
 from src import logger
-from src.services.time_decay import update_popularity
+from src.services.time_decay import schedule_popularity_job
+from src.services.job_queue import job_queue, public_job
+import src.services.mpad  # registers the profile_rebuild job
 from datetime import datetime, timezone
 import asyncio
 load_dotenv()
 
 router = APIRouter()
 
+def build_interaction(payload: InteractionLog, hook, timestamp):
+    implicit_tags = [hook.get("sourceInfo", {}).get("sonarTopicId", "")] + hook.get('relatedTopics', [])
+    return {
+        "hook_id": payload.hook_id,
+        "action": payload.action,
+        "duration": payload.duration,
+        "timestamp": timestamp,
+        "implicit_tags": implicit_tags
+    }
+
 @router.post("/log")
 async def log_interaction(payload: InteractionLog):
     try:
-        user_id = payload.user_id
-        hook_id = payload.hook_id
-        action = payload.action
-        duration = payload.duration
-        timestamp = datetime.now(timezone.utc)
-
-        hook = await hooks_collection.find_one({"_id": ObjectId(hook_id)})
+        hook = await hook_catalog.get(payload.hook_id)
         if not hook:
-            logger.error(f"Hook with ID {hook_id} not found.")
+            logger.error(f"Hook with ID {payload.hook_id} not found.")
             raise HTTPException(status_code=404, detail="Hook not found")
 
-        implicit_tags = [hook.get("sourceInfo", {}).get("sonarTopicId", "")] + hook.get('relatedTopics', [])
-
-        await log_collection.update_one(
-            {"user_id": user_id},
-            {
-                "$push": {
-                    "interactions": {
-                        "hook_id": hook_id,
-                        "action": action,
-                        "duration": duration,
-                        "timestamp": timestamp,
-                        "implicit_tags": implicit_tags
-                    }
-                }
-            },
-            upsert=True
-        )
-        logger.info(f"Interaction logged for user {user_id}")
+        interaction = build_interaction(payload, hook, datetime.now(timezone.utc))
+        await interaction_buffer.add(payload.user_id, interaction, hook)
+        logger.info(f"Interaction logged for user {payload.user_id}")
         return {"status": "Interaction logged"}
 
     except HTTPException:
@@ -54,9 +46,49 @@ async def log_interaction(payload: InteractionLog):
             detail="An error occurred while logging interaction"
         )
 
-@router.get('/popularity')
+@router.post("/log/batch")
+async def log_interactions(payload: List[InteractionLog]):
+    try:
+        timestamp = datetime.now(timezone.utc)
+        hooks = await hook_catalog.get_many(event.hook_id for event in payload)
+
+        rejected = []
+        for event in payload:
+            hook = hooks.get(event.hook_id)
+            if not hook:
+                rejected.append(event.hook_id)
+                continue
+            await interaction_buffer.add(event.user_id, build_interaction(event, hook, timestamp), hook)
+
+        if rejected:
+            logger.warning(f"Skipped interactions for unknown hooks: {rejected}")
+        return {
+            "status": "Interactions logged",
+            "accepted": len(payload) - len(rejected),
+            "rejected": rejected
+        }
+
+    except Exception as e:
+        logger.exception("Failed to log interaction batch")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while logging interactions"
+        )
+
+@router.get('/popularity', status_code=status.HTTP_202_ACCEPTED)
 async def popularity():
-    await update_popularity()
+    return public_job(await schedule_popularity_job())
+
+@router.get('/popularity/status')
+async def popularity_status():
+    job = await job_queue.latest("popularity")
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No popularity recompute has run yet")
+    return public_job(job)
+
+@router.post('/profiles/rebuild', status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_profiles():
+    return public_job(await job_queue.enqueue("profile_rebuild", singleton=True))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, HTTPException, status
+from src.services.job_queue import job_queue, public_job
+
+router = APIRouter()
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return public_job(job)
@@ -1,21 +1,21 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from src.schemas.profile_schemas import Profile, ProfileUpdate, UpdateTagsRequest
 from src.utils.security import Security
 from src.database.mongo import users_collection
+from src.services.user_cache import user_cache
+from src.services.auth_service import get_current_user
 from bson import ObjectId
 from src import logger
 
 router = APIRouter()
 
 async def get_profile_by_id(profile_id: str):
-    profile = await users_collection.find_one({"_id": ObjectId(profile_id)})
+    profile = await user_cache.get_user(profile_id)
     if profile is None:
         raise HTTPException(status_code=404, detail="Profile not found")
     return profile
 
-@router.get("/{profile_id}", response_model=Profile)
-async def get_profile(profile_id: str):
-    profile = await get_profile_by_id(profile_id)
+def to_profile(profile) -> Profile:
     return Profile(
         id=str(profile["_id"]),
         username=profile["username"],
@@ -29,6 +29,14 @@ async def get_profile(profile_id: str):
         streak=profile.get("streak", 0)
     )
 
+@router.get("/me", response_model=Profile)
+async def get_own_profile(user=Depends(get_current_user)):
+    return to_profile(user)
+
+@router.get("/{profile_id}", response_model=Profile)
+async def get_profile(profile_id: str):
+    return to_profile(await get_profile_by_id(profile_id))
+
 @router.post("/{profile_id}", response_model=Profile)
 async def update_profile(profile_id: str, profile_update: ProfileUpdate):
     profile = await get_profile_by_id(profile_id)
@@ -38,12 +46,13 @@ async def update_profile(profile_id: str, profile_update: ProfileUpdate):
     data_to_update = {"username": update_data["username"]}
     if "password" in update_data:
         security = Security()
-        data_to_update["password_hash"] = security.hash_password(update_data["password"])
+        data_to_update["password_hash"] = await security.ahash_password(update_data["password"])
 
     await users_collection.update_one(
         {"_id": ObjectId(profile_id)},
         {"$set": data_to_update}
     )
+    await user_cache.invalidate_user(profile_id)
 
     return Profile(
         id=str(profile_id),
@@ -63,6 +72,8 @@ async def delete_profile(profile_id: str):
     profile = await get_profile_by_id(profile_id)
     
     await users_collection.delete_one({"_id": ObjectId(profile_id)})
+    await user_cache.invalidate_user(profile_id)
+    await user_cache.invalidate_profile(profile_id)
     
     return {"message": "Profile deleted successfully"}
 
@@ -72,6 +83,7 @@ async def update_user_tags(profile_id: str, data: UpdateTagsRequest):
         {"_id": ObjectId(profile_id)},
         {"$set": {"tags": data.tags}}
     )
+    await user_cache.invalidate_user(profile_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="User not found or tags unchanged")
     return {"message": "Tags updated successfully"}
\ No newline at end of file
@@ -1,10 +1,8 @@
 from fastapi import APIRouter, HTTPException, status
-from src.database.mongo import hooks_collection, log_collection
 from src.schemas.quiz_schemas import QuizResponse
-from src.services.game import generate_quiz, update_xp
-import random
+from src.services.game import update_xp, sample_quiz_hooks
+from src.services.quiz_store import quiz_store
 import asyncio
-from bson import ObjectId
 from src import logger
 
 router = APIRouter()
@@ -12,45 +10,21 @@ router = APIRouter()
 @router.post('/quiz/{profile_id}', response_model=QuizResponse)
 async def quiz(profile_id: str, N: int = 1):
     try:
-        user_log = await log_collection.find_one({"user_id": profile_id})
-        if not user_log or "interactions" not in user_log:
+        if N < 1:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User does not exist or User log or interactions was not created"
-            )
-
-        interactions = user_log["interactions"]
-        if not interactions:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No hook interactions found for the user"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="At least one quiz question must be requested"
             )
 
-        user_hooks = []
-        for hook in interactions:
-            hook_doc = await hooks_collection.find_one({"_id": ObjectId(hook['hook_id'])})
-            if hook_doc:
-                user_hooks.append(hook_doc)
-
+        user_hooks = await sample_quiz_hooks(profile_id, N)
         if not user_hooks:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="No valid hook documents found"
-            )
-
-        number_quiz = min(N, len(user_hooks))
-        if number_quiz == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User has not viewed any hook yet"
+                detail="No hook interactions found for the user"
             )
 
-        nums = list(range(len(user_hooks)))
         quiz = []
-        for _ in range(number_quiz):
-            idx = random.choice(nums)
-            nums.remove(idx)
-            quiz_data = generate_quiz(user_hooks[idx])
+        for quiz_data in await asyncio.gather(*(quiz_store.get(hook) for hook in user_hooks)):
             if quiz_data and isinstance(quiz_data, list):
                 quiz.extend(quiz_data)
         return {"quiz": quiz}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class FeedResponse(BaseModel):
     feed: List[Dict[str, Any]]
@@ -9,3 +9,4 @@ class TopicRequest(BaseModel):
 
 class HookResponse(BaseModel):
     status: str
+    job_id: Optional[str] = None
@@ -1,10 +1,12 @@
-from fastapi import HTTPException, status
+from fastapi import HTTPException, status, Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from bson import ObjectId
 from datetime import datetime, timezone, timedelta
 from jose import jwt
 from src import logger
 from src.config.game import LOGIN_XP
 from src.database.mongo import users_collection
+from src.services.user_cache import user_cache
 from src.config.common_setting import settings
 from src.utils.security import Security, ALGORITHM
 from src.schemas.auth_schemas import RegisterRequest, RegisterResponse, LoginRequest, UserOut, TokenResponse
@@ -20,7 +22,7 @@ async def register_user(data: RegisterRequest):
                 detail="User with this username or email already exists"
             )
         security = Security()
-        hashed = security.hash_password(data.password)
+        hashed = await security.ahash_password(data.password)
 
         token_data = {
             "sub": data.email,
@@ -48,6 +50,7 @@ async def register_user(data: RegisterRequest):
         )
         updated_user = await users_collection.find_one({"email": data.email})
         user_data['_id'] = updated_user['_id']
+        await user_cache.invalidate_user(updated_user['_id'])
 
         await send_verification_email(to_email=data.email, token=verification_token)
 
@@ -69,6 +72,7 @@ async def register_user(data: RegisterRequest):
 
 async def login_user(user: LoginRequest):
     try:
+        # credentials and verification state are always read fresh from Mongo
         db_user = await users_collection.find_one({"email": user.email})
         if not db_user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
@@ -79,7 +83,7 @@ async def login_user(user: LoginRequest):
         needs_tags = not db_user.get("tags")
 
         security = Security()
-        if not security.verify_password(user.password, db_user["password_hash"]):
+        if not await security.averify_password(user.password, db_user["password_hash"]):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Incorrect password")
 
         now = datetime.now(timezone.utc)
@@ -108,6 +112,7 @@ async def login_user(user: LoginRequest):
             db_user["last_login"] = now
             db_user["streak"] = updated_streak
 
+        await user_cache.put_user(db_user)
         token = security.create_access_token({"sub": str(db_user["_id"])})
 
         user_out = UserOut(
@@ -132,3 +137,31 @@ async def login_user(user: LoginRequest):
     except Exception as e:
         logger.exception("Error in login_user")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+    """Dependency for protected routes: verifies the bearer token and resolves its user
+    once per request. The user is also left on request.state.user for the handler."""
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    claims = Security().verify_token(credentials.credentials)
+    user_id = claims.get("sub")
+    if not user_id or not ObjectId.is_valid(user_id):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+    user = await user_cache.get_user(user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User no longer exists")
+    request.state.user = user
+    return user
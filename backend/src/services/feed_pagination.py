@@ -0,0 +1,69 @@
+import base64
+import json
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi.encoders import jsonable_encoder
+from pymongo import DESCENDING
+from src.constants import FEED_PAGE_SIZE
+from src.database.mongo import hooks_feed_collection
+
+SCORE_FIELD = "metadata.popularity"
+FEED_SORT = [(SCORE_FIELD, DESCENDING), ("_id", DESCENDING)]
+# inline images and generated quizzes are served by their own routes
+FEED_PROJECTION = {"image_base64": 0, "quiz": 0, "search": 0}
+
+
+def encode_cursor(score, hook_id) -> str:
+    raw = json.dumps([score, str(hook_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Returns (score, ObjectId) from an opaque cursor; raises ValueError if it was tampered with"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, hook_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if score is not None and (not isinstance(score, (int, float)) or isinstance(score, bool)):
+            raise ValueError("cursor score must be a number or null")
+        return score, ObjectId(hook_id)
+    except (ValueError, TypeError, InvalidId, UnicodeError) as e:
+        raise ValueError(f"Invalid feed cursor: {e}") from e
+
+
+def page_query(tags, cursor=None):
+    """Hooks after `cursor` in (score, _id) descending order. Hooks without a score sort
+    after every scored hook, as MongoDB orders missing and null below numbers."""
+    query = {"tags": {"$in": tags}}
+    if cursor is not None:
+        score, hook_id = cursor
+        if score is None:
+            query[SCORE_FIELD] = None
+            query["_id"] = {"$lt": hook_id}
+        else:
+            query["$or"] = [
+                {SCORE_FIELD: {"$lt": score}},
+                {SCORE_FIELD: score, "_id": {"$lt": hook_id}},
+                {SCORE_FIELD: None},
+            ]
+    return query
+
+
+async def stream_feed_page(tags, cursor=None, limit=FEED_PAGE_SIZE, collection=hooks_feed_collection):
+    """Streams one page as the JSON document {"feed": [...], "next_cursor": ...}.
+
+    Hooks are written as they arrive from the driver, so memory stays bounded by the
+    page size. One extra hook is fetched to decide whether there is a next page."""
+    hooks = collection.find(
+        page_query(tags, cursor), projection=FEED_PROJECTION, sort=FEED_SORT, limit=limit + 1, batch_size=limit + 1
+    )
+    yield '{"feed":['
+    sent, last, next_cursor = 0, None, None
+    async for hook in hooks:
+        if sent == limit:
+            next_cursor = encode_cursor((last.get("metadata") or {}).get("popularity"), last["_id"])
+            break
+        hook_json = json.dumps(jsonable_encoder(hook, custom_encoder={ObjectId: str}))
+        yield hook_json if sent == 0 else "," + hook_json
+        sent, last = sent + 1, hook
+    await hooks.close()
+    yield '],"next_cursor":' + json.dumps(next_cursor) + "}"
@@ -2,10 +2,16 @@ from src.services.perplexity import PPLX
 from src.utils.common import load_json
 from src.constants import SCHEMA_DIR
 from src.config.game import QUIZ_SYSTEM_MESSAGE
-from src.database.mongo import users_collection
+from src.constants import QUIZ_INTERACTION_WINDOW
+from src.database.mongo import users_collection, hooks_collection
+from src.services.interaction_store import recent_interactions
+from src.services.user_cache import user_cache
 from fastapi import HTTPException, status
 from bson import ObjectId
 from src import logger
+import random
+
+QUIZ_HOOK_PROJECTION = {"headline": 1, "hookText": 1, "expandedContent": 1}
 
 def normalize_quiz(quiz_list):
     cleaned = []
@@ -29,14 +35,14 @@ def normalize_quiz(quiz_list):
         })
     return cleaned
 
-def generate_quiz(hook):
+async def generate_quiz(hook):
     try:
         pplx = PPLX()
         quiz_schema = load_json((SCHEMA_DIR / 'quiz_response.json'))
         pplx.set_template(system_msg=QUIZ_SYSTEM_MESSAGE)
         
         input_text = f"{hook.get('headline', '')}\n{hook.get('hookText', '')}\n{hook.get('expandedContent', '')}"
-        response = pplx.get_prompt(input=input_text, schema=quiz_schema)
+        response = await pplx.aget_prompt(input=input_text, schema=quiz_schema)
         
         if "quiz" in response and isinstance(response["quiz"], list):
             response["quiz"] = response["quiz"][:1]  # Cause there is problem with maxItems of perplexity api
@@ -50,6 +56,33 @@ def generate_quiz(hook):
             detail=f"Quiz generation failed: {str(e)}"
         )
 
+async def sample_quiz_hooks(user_id: str, N: int, rng=random):
+    """Picks up to N distinct hooks from the user's recent interactions.
+
+    Hook ids are reservoir-sampled while streaming the interaction buckets, so only
+    the sampled hooks are fetched, in a single $in query limited to the quiz fields."""
+    seen = set()
+    reservoir = []
+    async for interaction in recent_interactions(user_id, limit=QUIZ_INTERACTION_WINDOW):
+        hook_id = interaction.get("hook_id")
+        if hook_id in seen or not ObjectId.is_valid(hook_id):
+            continue
+        seen.add(hook_id)
+        if len(reservoir) < N:
+            reservoir.append(hook_id)
+        else:
+            j = rng.randrange(len(seen))
+            if j < N:
+                reservoir[j] = hook_id
+
+    if not reservoir:
+        return []
+    cursor = hooks_collection.find(
+        {"_id": {"$in": [ObjectId(hook_id) for hook_id in reservoir]}},
+        projection=QUIZ_HOOK_PROJECTION
+    )
+    return await cursor.to_list(length=len(reservoir))
+
 async def update_xp(user_id: str, xp: int):
     try:
         result = await users_collection.update_one(
@@ -61,6 +94,7 @@ async def update_xp(user_id: str, xp: int):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found for XP update"
             )
+        await user_cache.invalidate_user(user_id)
         return {'status': 'ok'}
 
     except HTTPException:
@@ -1,46 +1,48 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 from src import logger
-import base64
-import io
-from PIL import Image
+from src.services.llm import llm_clients
 from src.constants import IMAGE_MODEL_NAME
 load_dotenv()
 
 
 class GEMINI:
     def __init__(self, model_name=IMAGE_MODEL_NAME):
-        self.chat = ChatGoogleGenerativeAI(
-            model=model_name
-        )
+        self.chat = llm_clients.get("gemini", model=model_name)
 
     def get_image(self, input: str):
         try:
-            prompt = f"{input.strip()} in 16:9 aspect ratio"
-            response = self.chat.invoke(
+            response = llm_clients.invoke(
+                "gemini",
+                self.chat,
                 [input],
                 generation_config=dict(response_modalities=["IMAGE", "TEXT"])
             )
-            
-            image_base64 = self._extract_image_base64(response)
-            if not image_base64:
-                logger.error("No image found in the response for prompt: %s", input)
-                raise ValueError("Image generation failed: no image data found in the response.")
-
-            image_bytes = base64.b64decode(image_base64)
-            image = Image.open(io.BytesIO(image_bytes))
-            if self._is_aspect_ratio_16_9(image):
-                logger.warning("Image is not 16:9, resizing...")
-                image = self._make_image_16_9(image)
-            
-            output_buffer = io.BytesIO()
-            image.save(output_buffer, format='PNG')
-            return base64.b64encode(output_buffer.getvalue()).decode()
+            return self._process_response(response, input)
+        except Exception as e:
+            logger.exception("Exception occurred during image generation: %s", e)
+            raise RuntimeError(f"Failed to generate image for prompt: {input}") from e
 
+    async def aget_image(self, input: str):
+        try:
+            response = await llm_clients.ainvoke(
+                "gemini",
+                self.chat,
+                [input],
+                generation_config=dict(response_modalities=["IMAGE", "TEXT"])
+            )
+            return self._process_response(response, input)
         except Exception as e:
             logger.exception("Exception occurred during image generation: %s", e)
             raise RuntimeError(f"Failed to generate image for prompt: {input}") from e
 
+    def _process_response(self, response, input: str):
+        """Returns the raw base64 image; cropping and re-encoding happen in the image pipeline"""
+        image_base64 = self._extract_image_base64(response)
+        if not image_base64:
+            logger.error("No image found in the response for prompt: %s", input)
+            raise ValueError("Image generation failed: no image data found in the response.")
+        return image_base64
+
     def _extract_image_base64(self, response):
         try:
             image_block = next(
@@ -59,25 +61,6 @@ class GEMINI:
         except (StopIteration, AttributeError, KeyError) as e:
             logger.warning("Failed to extract image base64 data: %s", e)
             return None
-    
-    def _is_aspect_ratio_16_9(self, image: Image.Image) -> bool:
-        width, height = image.size
-        return abs((width / height) - (16 / 9)) < 0.01  # Allow small margin
-
-    def _make_image_16_9(self, image: Image.Image) -> Image.Image:
-        target_ratio = 16 / 9
-        width, height = image.size
-        current_ratio = width / height
-
-        if current_ratio > target_ratio:
-            new_width = int(height * target_ratio)
-            offset = (width - new_width) // 2
-            return image.crop((offset, 0, offset + new_width, height))
-        else:
-            new_height = int(width / target_ratio)
-            offset = (height - new_height) // 2
-            return image.crop((0, offset, width, offset + new_height))
-
 
 
 if __name__ == "__main__":
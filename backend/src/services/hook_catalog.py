@@ -0,0 +1,178 @@
+import asyncio
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+from src.constants import HOOK_CATALOG_MAX_SIZE, HOOK_CATALOG_POLL_INTERVAL, HOOK_CATALOG_MAX_BACKOFF
+from src.database.mongo import hooks_collection
+from src.services.scoring import HookMatrix
+from src.utils.cache import LRUCache
+from src.utils.common import parse_timestamp
+from src import logger
+
+METADATA_FIELDS = ("createdAt", "popularity", "viewCount", "likeCount", "saveCount", "shareCount")
+
+CATALOG_PROJECTION = {
+    "tags": 1,
+    "relatedTopics": 1,
+    "sourceInfo.sonarTopicId": 1,
+    **{f"metadata.{field}": 1 for field in METADATA_FIELDS},
+}
+
+
+def compact_hook(doc):
+    """Reduces a hook document to the fields the hot paths need, parsing createdAt once"""
+    metadata = doc.get("metadata") or {}
+    compact_metadata = {field: metadata[field] for field in METADATA_FIELDS if field in metadata}
+    if "createdAt" in compact_metadata:
+        compact_metadata["createdAt"] = parse_timestamp(compact_metadata["createdAt"])
+    return {
+        "_id": doc["_id"],
+        "tags": list(doc.get("tags") or []),
+        "relatedTopics": list(doc.get("relatedTopics") or []),
+        "sourceInfo": {"sonarTopicId": (doc.get("sourceInfo") or {}).get("sonarTopicId", "")},
+        "metadata": compact_metadata,
+    }
+
+
+class HookCatalog:
+    """In-process, memory-bounded catalog of compact hook documents.
+
+    Loaded once at startup and kept fresh from a MongoDB change stream, or by
+    periodic reloads when change streams are unavailable (standalone servers
+    and local stand-ins). Cold hooks are evicted least-recently-used first. A
+    failed load is retried with backoff before the change stream is reopened."""
+
+    def __init__(self, collection=hooks_collection, max_size=HOOK_CATALOG_MAX_SIZE,
+                 poll_interval=HOOK_CATALOG_POLL_INTERVAL, max_backoff=HOOK_CATALOG_MAX_BACKOFF):
+        self.collection = collection
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self._stale = True
+        self._hooks = LRUCache(max_size)
+        self._version = 0
+        self._matrix = None
+        self._matrix_version = -1
+        self._task = None
+
+    def __len__(self):
+        return len(self._hooks)
+
+    def put(self, doc):
+        self._hooks.set(str(doc["_id"]), compact_hook(doc))
+        self._version += 1
+
+    def remove(self, hook_id):
+        if self._hooks.pop(str(hook_id)) is not None:
+            self._version += 1
+
+    async def load(self):
+        """Replaces the catalog with the newest hooks, up to the size limit"""
+        docs = await self.collection.find({}, projection=CATALOG_PROJECTION) \
+            .sort("_id", -1).limit(self._hooks.maxsize).to_list(length=None)
+        self._hooks.clear()
+        for doc in reversed(docs):
+            self._hooks.set(str(doc["_id"]), compact_hook(doc))
+        self._version += 1
+        self._stale = False
+        logger.info(f"Hook catalog loaded {len(docs)} hooks")
+
+    async def _reload(self):
+        """Reloads the catalog, backing off while MongoDB stays unreachable"""
+        delay = self.poll_interval
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                return await self.load()
+            except Exception as e:
+                delay = min(delay * 2, self.max_backoff)
+                logger.warning(f"Failed to reload hook catalog, retrying in {delay}s: {e}")
+
+    async def get(self, hook_id):
+        hook_id = str(hook_id)
+        hook = self._hooks.get(hook_id)
+        if hook is None and ObjectId.is_valid(hook_id):
+            doc = await self.collection.find_one({"_id": ObjectId(hook_id)}, projection=CATALOG_PROJECTION)
+            if doc:
+                self.put(doc)
+                hook = self._hooks.peek(hook_id)
+        return hook
+
+    async def get_many(self, hook_ids):
+        hooks = {}
+        missing = []
+        for hook_id in {str(hook_id) for hook_id in hook_ids}:
+            hook = self._hooks.get(hook_id)
+            if hook is not None:
+                hooks[hook_id] = hook
+            elif ObjectId.is_valid(hook_id):
+                missing.append(ObjectId(hook_id))
+        if missing:
+            async for doc in self.collection.find({"_id": {"$in": missing}}, projection=CATALOG_PROJECTION):
+                self.put(doc)
+                hooks[str(doc["_id"])] = self._hooks.peek(str(doc["_id"]))
+        return hooks
+
+    def snapshot(self):
+        return self._hooks.values()
+
+    def matrix(self):
+        """Columnar view of the catalog, rebuilt only after the catalog changed"""
+        if self._matrix_version != self._version:
+            self._matrix = HookMatrix(self.snapshot())
+            self._matrix_version = self._version
+        return self._matrix
+
+    def _apply_change(self, change):
+        operation = change.get("operationType")
+        if operation in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            if doc:
+                self.put(doc)
+        elif operation == "delete":
+            self.remove(change["documentKey"]["_id"])
+        elif operation in ("drop", "invalidate"):
+            self._hooks.clear()
+            self._version += 1
+
+    async def _watch(self):
+        pipeline = [{"$project": {
+            "operationType": 1,
+            "documentKey": 1,
+            "fullDocument._id": 1,
+            **{f"fullDocument.{field}": 1 for field in CATALOG_PROJECTION},
+        }}]
+        while True:
+            if self._stale:
+                await self._reload()
+            try:
+                async with self.collection.watch(pipeline, full_document="updateLookup") as stream:
+                    async for change in stream:
+                        self._apply_change(change)
+            except OperationFailure as e:
+                logger.warning(f"Change streams unavailable, polling hook catalog instead: {e}")
+                return await self._poll()
+            except PyMongoError as e:
+                logger.warning(f"Hook catalog change stream interrupted: {e}")
+                self._stale = True
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.exception(f"Failed to refresh hook catalog: {e}")
+
+    async def start(self):
+        try:
+            await self.load()
+        except Exception as e:
+            logger.exception(f"Failed to load hook catalog: {e}")
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+hook_catalog = HookCatalog()
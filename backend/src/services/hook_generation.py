@@ -0,0 +1,85 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from src.constants import SCHEMA_DIR, SYSTEM_MESSAGES, HOOK_GENERATION_CONCURRENCY
+from src.database.mongo import hooks_collection
+from src.services.image_index import image_index
+from src.services.hook_catalog import hook_catalog
+from src.services.job_queue import job_queue
+from src.services.perplexity import PPLX
+from src.services.gemini import GEMINI
+from src.utils.common import load_json
+from src import logger
+
+
+def _initial_metadata():
+    return {
+        "createdAt": datetime.now(timezone.utc).isoformat() + "Z",
+        "popularity": 0,
+        "saveCount": random.randint(1, 50),
+        "shareCount": random.randint(1, 100),
+        "likeCount": random.randint(5, 500),
+        "viewCount": random.randint(5, 500),
+        "viral": random.randint(0, 1)
+    }
+
+
+async def generate_topic_hook(topic: str, schema, gemini: GEMINI):
+    pplx = PPLX()
+    pplx.set_template(system_msg=SYSTEM_MESSAGES[topic])
+    hook = await pplx.aget_prompt(schema=schema, input=f"Generate a hook on the topic, {topic}")
+
+    if "category" not in hook:
+        hook["category"] = topic.capitalize()
+
+    image_prompt = hook.get('img_desc')
+    if image_prompt:
+        try:
+            hook["image_url"], hook["image_srcset"] = await image_index.render(image_prompt, gemini)
+        except Exception as img_err:
+            logger.error(f"Image generation/upload failed for topic {topic}: {img_err}")
+            hook["image_url"], hook["image_srcset"] = None, None
+
+    hook["metadata"] = _initial_metadata()
+    return hook
+
+
+async def generate_hooks(topics, concurrency=HOOK_GENERATION_CONCURRENCY):
+    """Generates one hook per topic concurrently and stores them with a single insert_many.
+
+    Returns:
+        tuple: (stored hooks, topics that failed)
+    """
+    schema = load_json(SCHEMA_DIR / "feed_response.json")
+    gemini = GEMINI()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(topic):
+        async with semaphore:
+            logger.debug("Generating hook for topic: %s", topic)
+            return await generate_topic_hook(topic, schema, gemini)
+
+    results = await asyncio.gather(*(run(topic) for topic in topics), return_exceptions=True)
+
+    hooks, failed = [], []
+    for topic, result in zip(topics, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to generate hook for topic {topic}: {result}")
+            failed.append(topic)
+        else:
+            hooks.append(result)
+
+    if hooks:
+        await hooks_collection.insert_many(hooks, ordered=False)
+        for hook in hooks:
+            hook_catalog.put(hook)
+
+    return hooks, failed
+
+
+@job_queue.handler("generate_hooks")
+async def run_hook_generation(payload, report):
+    hooks, failed = await generate_hooks(payload["topics"])
+    if not hooks:
+        raise RuntimeError(f"Failed to generate hook for topics: {', '.join(failed)}")
+    return {"hook_ids": [str(hook["_id"]) for hook in hooks], "failed": failed}
@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from src.config.common_setting import settings
+from src.database.mongo import image_index_collection
+from src.services.image_pipeline import image_pipeline
+from src.services.search_cache import normalize_query
+from src import logger
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(normalize_query(prompt).encode("utf-8")).hexdigest()
+
+
+class ImageIndex:
+    """Maps normalized img_desc prompts to the renditions generated for them.
+
+    Every render is recorded; when `reuse` is enabled an equivalent prompt is served
+    from the index and Gemini is skipped entirely."""
+
+    def __init__(self, collection=image_index_collection, pipeline=image_pipeline,
+                 reuse=settings.IMAGE_PROMPT_REUSE):
+        self.collection = collection
+        self.pipeline = pipeline
+        self.reuse = reuse
+        self.hits = 0
+        self.misses = 0
+        self._inflight = {}
+
+    async def lookup(self, prompt: str):
+        entry = await self.collection.find_one({"_id": prompt_key(prompt)})
+        if entry is None:
+            return None
+        return entry["image_url"], entry.get("image_srcset")
+
+    async def _render(self, key: str, prompt: str, gemini):
+        image_base64 = await gemini.aget_image(input=prompt)
+        if not image_base64:
+            raise ValueError("Empty image returned from Gemini")
+        image_url, image_srcset = await self.pipeline.process_base64(image_base64)
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {
+                    "prompt": normalize_query(prompt),
+                    "image_url": image_url,
+                    "image_srcset": image_srcset,
+                    "updatedAt": datetime.now(timezone.utc),
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record image for prompt {key}: {e}")
+        return image_url, image_srcset
+
+    async def render(self, prompt: str, gemini):
+        """Returns (image_url, image_srcset) for `prompt`, rendering it with Gemini unless reusable"""
+        if not self.reuse:
+            self.misses += 1
+            return await self._render(prompt_key(prompt), prompt, gemini)
+
+        key = prompt_key(prompt)
+        cached = await self.lookup(prompt)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._render(key, prompt, gemini))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def metrics(self):
+        return {
+            "reuse": self.reuse,
+            "hits": self.hits,
+            "misses": self.misses,
+            "uploaded": self.pipeline.store.uploaded,
+            "deduplicated": self.pipeline.store.deduplicated,
+        }
+
+
+image_index = ImageIndex()
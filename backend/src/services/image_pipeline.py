@@ -0,0 +1,146 @@
+import asyncio
+import base64
+import hashlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from src.config.common_setting import settings
+from src.constants import IMAGE_ASPECT_RATIO, IMAGE_RENDITIONS, IMAGE_DEFAULT_RENDITION, IMAGE_PROCESS_WORKERS
+from src.database.mongo import hooks_collection
+from src.services.image_store import image_store, ImageStore
+from src.services.job_queue import job_queue
+from src import logger
+
+CONTENT_TYPES = {"WEBP": "image/webp", "AVIF": "image/avif"}
+
+
+def is_aspect_ratio(image: Image.Image, ratio: float = IMAGE_ASPECT_RATIO) -> bool:
+    width, height = image.size
+    return abs((width / height) - ratio) < 0.01  # Allow small margin
+
+
+def crop_to_aspect_ratio(image: Image.Image, ratio: float = IMAGE_ASPECT_RATIO) -> Image.Image:
+    width, height = image.size
+    if width / height > ratio:
+        new_width = int(height * ratio)
+        offset = (width - new_width) // 2
+        return image.crop((offset, 0, offset + new_width, height))
+    new_height = int(width / ratio)
+    offset = (height - new_height) // 2
+    return image.crop((0, offset, width, offset + new_height))
+
+
+def render_renditions(image_bytes: bytes, renditions=IMAGE_RENDITIONS, image_format: str = "WEBP"):
+    """Decodes the image once, crops it to 16:9 and encodes one downscaled copy per rendition.
+
+    Runs inside a worker process, so it only takes and returns plain bytes.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    if not is_aspect_ratio(image):
+        image = crop_to_aspect_ratio(image)
+
+    encoded = {}
+    for name, (max_width, quality) in renditions.items():
+        rendition = image
+        if image.width > max_width:
+            size = (max_width, round(max_width * image.height / image.width))
+            rendition = image.resize(size, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        rendition.save(buffer, format=image_format, quality=quality)
+        encoded[name] = buffer.getvalue()
+    return encoded
+
+
+class ImagePipeline:
+    """Turns a generated image into cropped, multi-resolution renditions in a process
+    pool and uploads them through the image store."""
+
+    def __init__(self, store: ImageStore = image_store, workers: int = IMAGE_PROCESS_WORKERS,
+                 image_format: str = settings.IMAGE_FORMAT):
+        self.store = store
+        self.workers = workers
+        self.image_format = image_format.upper()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def render(self, image_bytes: bytes):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), render_renditions, image_bytes, IMAGE_RENDITIONS, self.image_format
+        )
+
+    async def process(self, image_bytes: bytes):
+        """Returns (image_url, image_srcset) where image_srcset maps rendition name to URL.
+
+        Renditions live under the SHA-256 of the source image, so a source that was
+        already processed is neither re-encoded nor uploaded again."""
+        prefix = hashlib.sha256(image_bytes).hexdigest()
+        extension = self.image_format.lower()
+        keys = {name: f"{prefix}/{name}.{extension}" for name in IMAGE_RENDITIONS}
+        if await self.store.exists(keys[IMAGE_DEFAULT_RENDITION]):
+            self.store.deduplicated += 1
+            srcset = {name: self.store.url(key) for name, key in keys.items()}
+            return srcset[IMAGE_DEFAULT_RENDITION], srcset
+
+        renditions = await self.render(image_bytes)
+        content_type = CONTENT_TYPES[self.image_format]
+        urls = await asyncio.gather(*(
+            self.store.save(renditions[name], content_type, key=key) for name, key in keys.items()
+        ))
+        srcset = dict(zip(keys, urls))
+        return srcset[IMAGE_DEFAULT_RENDITION], srcset
+
+    async def process_base64(self, image_base64: str):
+        return await self.process(base64.b64decode(image_base64))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_pipeline = ImagePipeline()
+
+
+@job_queue.handler("migrate_images")
+async def run_image_migration(payload, report):
+    return {"images": await migrate_inline_images()}
+
+
+async def schedule_image_migration():
+    """Queues the inline image migration while hooks still carry image_base64"""
+    if await hooks_collection.find_one({"image_base64": {"$exists": True}}, projection={"_id": 1}) is None:
+        return None
+    return await job_queue.enqueue("migrate_images", singleton=True)
+
+
+async def migrate_inline_images(pipeline: ImagePipeline = image_pipeline, collection=hooks_collection):
+    """Moves image_base64 payloads still stored on hook documents through the image pipeline"""
+    migrated = 0
+    cursor = collection.find({"image_base64": {"$exists": True}}, projection={"image_base64": 1})
+    async for hook in cursor:
+        update = {"$unset": {"image_base64": ""}}
+        if hook.get("image_base64"):
+            try:
+                image_url, image_srcset = await pipeline.process_base64(hook["image_base64"])
+            except Exception:
+                logger.exception(f"Failed to migrate inline image of hook {hook['_id']}")
+                continue
+            update["$set"] = {"image_url": image_url, "image_srcset": image_srcset}
+        await collection.update_one({"_id": hook["_id"]}, update)
+        migrated += 1
+    logger.info(f"Moved {migrated} inline images out of the hooks collection")
+    return migrated
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(migrate_inline_images())
+    finally:
+        image_pipeline.shutdown()
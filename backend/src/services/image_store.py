@@ -0,0 +1,98 @@
+import asyncio
+import base64
+import hashlib
+from io import BytesIO
+from pathlib import Path
+from botocore.exceptions import ClientError
+from src.config.common_setting import settings
+from src.constants import S3_UPLOAD_CONCURRENCY
+from src.database.s3 import s3_client
+
+
+class S3ImageBackend:
+    def __init__(self, client=s3_client, bucket=settings.S3_BUCKET_NAME, region=settings.AWS_REGION):
+        self.client = client
+        self.bucket = bucket
+        self.region = region
+
+    def put(self, key: str, data: bytes, content_type: str):
+        self.client.upload_fileobj(BytesIO(data), self.bucket, key, ExtraArgs={"ContentType": content_type})
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def url(self, key: str) -> str:
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
+
+
+class FilesystemImageBackend:
+    """Local stand-in for S3: files are written under `root` and served from `base_url`"""
+
+    def __init__(self, root=settings.IMAGE_STORE_DIR, base_url=settings.IMAGE_STORE_BASE_URL):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def put(self, key: str, data: bytes, content_type: str):
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).is_file()
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+def content_key(data: bytes, content_type: str = "image/png") -> str:
+    return f"{hashlib.sha256(data).hexdigest()}.{content_type.split('/')[-1]}"
+
+
+class ImageStore:
+    """Uploads images to object storage from worker threads; hooks only keep the URL.
+
+    Images saved without an explicit key are stored under the SHA-256 of their bytes,
+    so identical images share one object and are only uploaded once."""
+
+    def __init__(self, backend, concurrency=S3_UPLOAD_CONCURRENCY):
+        self.backend = backend
+        self._limit = asyncio.Semaphore(concurrency)
+        self.uploaded = 0
+        self.deduplicated = 0
+
+    def url(self, key: str) -> str:
+        return self.backend.url(key)
+
+    async def exists(self, key: str) -> bool:
+        async with self._limit:
+            return await asyncio.to_thread(self.backend.exists, key)
+
+    async def save(self, data: bytes, content_type: str = "image/png", key: str = None) -> str:
+        if key is None:
+            key = content_key(data, content_type)
+            if await self.exists(key):
+                self.deduplicated += 1
+                return self.backend.url(key)
+        async with self._limit:
+            await asyncio.to_thread(self.backend.put, key, data, content_type)
+        self.uploaded += 1
+        return self.backend.url(key)
+
+    async def save_base64(self, image_base64: str, content_type: str = "image/png") -> str:
+        return await self.save(base64.b64decode(image_base64), content_type)
+
+
+def build_image_store():
+    if settings.IMAGE_STORE_BACKEND == "filesystem":
+        return ImageStore(FilesystemImageBackend())
+    return ImageStore(S3ImageBackend())
+
+
+image_store = build_image_store()
+
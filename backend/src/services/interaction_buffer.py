@@ -0,0 +1,160 @@
+import asyncio
+from collections import defaultdict
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timezone
+from src.constants import INTERACTION_FLUSH_INTERVAL, INTERACTION_BUFFER_MAX_EVENTS
+from src.database.mongo import interaction_bucket_collection, profile_collection
+from src.services.interaction_store import bucket_updates
+from src.services.mpad import fetch_explicit_tags, interest_deltas, profile_update
+from src.services.user_cache import user_cache
+from src import logger
+
+
+async def _bulk_write(collection, ops):
+    """Runs an unordered bulk_write and returns the indexes of the operations that failed.
+
+    Write errors name the exact operations that were not applied. Any other error leaves
+    the outcome unknown and counts every operation as failed; the driver has already
+    retried once, with retryable writes making that retry safe."""
+    if not ops:
+        return set()
+    try:
+        await collection.bulk_write(ops, ordered=False)
+        return set()
+    except BulkWriteError as e:
+        logger.warning(f"{len(e.details.get('writeErrors', []))} of {len(ops)} writes to {collection.name} failed")
+        return {error["index"] for error in e.details.get("writeErrors", [])}
+    except Exception:
+        logger.exception(f"Bulk write to {collection.name} failed")
+        return set(range(len(ops)))
+
+
+class InteractionBuffer:
+    """Coalesces logged interactions per user and writes them every `flush_interval`
+    seconds: one bulk_write for the interaction buckets and one for the interest
+    profiles, however many events arrived in between.
+
+    Nothing is dropped when a write fails. Events whose bucket write failed go back to
+    the buffer. Profile deltas are only computed from events already in a bucket, and
+    failed deltas are kept apart and retried alone, so an event rejected by the server
+    is never appended or counted twice. A write that fails with an unknown outcome (a
+    network error that outlasts the driver's own retry) is retried as well, so in that
+    case an event or its $inc may be applied twice: delivery is at least once.
+
+    `add` never writes inline; a full buffer wakes the background flusher instead."""
+
+    def __init__(self, flush_interval=INTERACTION_FLUSH_INTERVAL, max_events=INTERACTION_BUFFER_MAX_EVENTS,
+                 buckets=interaction_bucket_collection, profiles=profile_collection):
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.buckets = buckets
+        self.profiles = profiles
+        self._pending = defaultdict(list)
+        self._pending_deltas = {}
+        self._size = 0
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return self._size
+
+    async def add(self, user_id, interaction, hook):
+        self._pending[user_id].append((interaction, hook))
+        self._size += 1
+        if self._size >= self.max_events:
+            self._wake.set()
+
+    def _requeue(self, events_by_user):
+        for user_id, events in events_by_user.items():
+            self._pending[user_id] = events + self._pending[user_id]
+            self._size += len(events)
+
+    def _requeue_deltas(self, user_id, deltas):
+        merged = self._pending_deltas.setdefault(user_id, defaultdict(float))
+        for tag, value in deltas.items():
+            merged[tag] += value
+
+    async def _write_buckets(self, pending):
+        """Appends pending events to their buckets; returns the events that were stored"""
+        ops, owners = [], []
+        for user_id, events in pending.items():
+            hooks = {id(interaction): hook for interaction, hook in events}
+            for op, interactions in bucket_updates(user_id, [interaction for interaction, _ in events]):
+                ops.append(op)
+                owners.append((user_id, [(i, hooks[id(i)]) for i in interactions]))
+
+        failed = await _bulk_write(self.buckets, ops)
+        stored, retry = defaultdict(list), defaultdict(list)
+        for index, (user_id, events) in enumerate(owners):
+            (retry if index in failed else stored)[user_id].extend(events)
+        self._requeue(retry)
+        return stored
+
+    async def _write_profiles(self, deltas_by_user, now):
+        user_ids = list(deltas_by_user)
+        failed = await _bulk_write(
+            self.profiles, [profile_update(user_id, deltas_by_user[user_id], now) for user_id in user_ids]
+        )
+        for index in failed:
+            self._requeue_deltas(user_ids[index], deltas_by_user[user_ids[index]])
+        written = [user_id for index, user_id in enumerate(user_ids) if index not in failed]
+        await user_cache.invalidate_profile(*written)
+
+    async def flush(self):
+        async with self._lock:
+            pending, self._pending = self._pending, defaultdict(list)
+            deltas_by_user, self._pending_deltas = self._pending_deltas, {}
+            self._size = 0
+            if not pending and not deltas_by_user:
+                return 0
+
+            try:
+                explicit_tags = await fetch_explicit_tags(pending.keys()) if pending else {}
+            except Exception:
+                self._requeue(pending)
+                for user_id, deltas in deltas_by_user.items():
+                    self._requeue_deltas(user_id, deltas)
+                raise
+
+            now = datetime.now(timezone.utc)
+            stored = await self._write_buckets(pending)
+            for user_id, events in stored.items():
+                deltas = deltas_by_user.setdefault(user_id, defaultdict(float))
+                for interaction, hook in events:
+                    for tag, value in interest_deltas(hook, interaction, explicit_tags.get(user_id)).items():
+                        deltas[tag] += value
+            await self._write_profiles(deltas_by_user, now)
+
+            size = sum(len(events) for events in stored.values())
+            logger.info(f"Flushed {size} interactions for {len(stored)} users")
+            return size
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush interaction buffer")
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the periodic flush and drains whatever is still buffered"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._size or self._pending_deltas:
+            logger.error(f"Shutting down with {self._size} interactions and "
+                         f"{len(self._pending_deltas)} profile updates still unwritten")
+
+
+interaction_buffer = InteractionBuffer()
@@ -0,0 +1,109 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from pymongo import DESCENDING, UpdateOne
+from src.constants import INTERACTION_BUCKET_SECONDS, INTERACTION_BUCKET_SIZE
+from src.database.mongo import interaction_bucket_collection, log_collection
+from src.services.job_queue import job_queue
+from src.utils.common import parse_timestamp
+from src import logger
+
+# Each document holds at most INTERACTION_BUCKET_SIZE events of one user inside one
+# INTERACTION_BUCKET_SECONDS window:
+# {user_id, bucket_start, count, first_ts, last_ts, interactions: [...]}
+
+
+def bucket_start(timestamp: datetime) -> datetime:
+    epoch = parse_timestamp(timestamp).timestamp()
+    return datetime.fromtimestamp(epoch - epoch % INTERACTION_BUCKET_SECONDS, tz=timezone.utc)
+
+
+def bucket_updates(user_id, interactions, size=INTERACTION_BUCKET_SIZE):
+    """(UpdateOne, events) pairs appending interactions to the user's open buckets.
+
+    Events are pushed in chunks of at most `size`, and a chunk only lands in a bucket
+    with room for all of it; otherwise the upsert starts a new bucket for the window."""
+    buckets = defaultdict(list)
+    for interaction in interactions:
+        buckets[bucket_start(interaction["timestamp"])].append(interaction)
+
+    updates = []
+    for start, window in sorted(buckets.items()):
+        for offset in range(0, len(window), size):
+            events = window[offset:offset + size]
+            timestamps = [event["timestamp"] for event in events]
+            updates.append((UpdateOne(
+                {"user_id": user_id, "bucket_start": start, "count": {"$lte": size - len(events)}},
+                {
+                    "$push": {"interactions": {"$each": events}},
+                    "$inc": {"count": len(events)},
+                    "$min": {"first_ts": min(timestamps)},
+                    "$max": {"last_ts": max(timestamps)},
+                },
+                upsert=True
+            ), events))
+    return updates
+
+
+async def append_interactions(user_id, interactions):
+    updates = [op for op, _ in bucket_updates(user_id, interactions)]
+    if updates:
+        await interaction_bucket_collection.bulk_write(updates, ordered=False)
+
+
+async def recent_interactions(user_id, limit=None):
+    """Yields the user's interactions newest first, reading only as many buckets as needed"""
+    cursor = interaction_bucket_collection.find(
+        {"user_id": user_id},
+        projection={"interactions": 1},
+        sort=[("last_ts", DESCENDING)]
+    )
+    yielded = 0
+    async for bucket in cursor:
+        events = sorted(bucket.get("interactions", []), key=lambda e: parse_timestamp(e["timestamp"]), reverse=True)
+        for interaction in events:
+            if limit is not None and yielded >= limit:
+                return
+            yield interaction
+            yielded += 1
+
+
+async def all_user_interactions():
+    """Yields (user_id, interaction) for every stored interaction"""
+    async for bucket in interaction_bucket_collection.find({}, projection={"user_id": 1, "interactions": 1}):
+        for interaction in bucket.get("interactions", []):
+            yield bucket["user_id"], interaction
+
+
+@job_queue.handler("migrate_interactions")
+async def run_interaction_migration(payload, report):
+    return {"interactions": await migrate_legacy_interactions()}
+
+
+async def schedule_interaction_migration():
+    """Queues the legacy migration while unmigrated interaction logs remain"""
+    if await log_collection.find_one({"migrated": {"$ne": True}}, projection={"_id": 1}) is None:
+        return None
+    return await job_queue.enqueue("migrate_interactions", singleton=True)
+
+
+async def migrate_legacy_interactions():
+    """Moves the per-user `interactions` arrays of the legacy log collection into buckets.
+
+    Safe to re-run: each log is flagged once its interactions are in buckets. A run cut
+    short between the two writes re-appends that one user's log on the next run."""
+    migrated = 0
+    async for log in log_collection.find({"migrated": {"$ne": True}}):
+        interactions = [
+            {**i, "timestamp": parse_timestamp(i["timestamp"])}
+            for i in log.get("interactions", []) if parse_timestamp(i.get("timestamp"))
+        ]
+        await append_interactions(log["user_id"], interactions)
+        await log_collection.update_one({"_id": log["_id"]}, {"$set": {"migrated": True}})
+        migrated += len(interactions)
+    logger.info(f"Migrated {migrated} legacy interactions into buckets")
+    return migrated
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_legacy_interactions())
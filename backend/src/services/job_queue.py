@@ -0,0 +1,220 @@
+import asyncio
+from datetime import datetime, timezone, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from src.config.common_setting import settings
+from src.constants import JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_DELAY, JOB_POLL_INTERVAL, JOB_LEASE_SECONDS
+from src.database.mongo import job_collection
+from src import logger
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def retry_delay(attempts: int, base: float = JOB_RETRY_BASE_DELAY) -> float:
+    return base * 2 ** max(attempts - 1, 0)
+
+
+def public_job(job):
+    """Shape returned by the job status endpoints"""
+    if job is None:
+        return None
+    return {
+        "job_id": str(job["_id"]),
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "max_attempts": job.get("max_attempts", JOB_MAX_ATTEMPTS),
+        "progress": job.get("progress") or {},
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+
+class JobQueue:
+    """Mongo-backed queue for work that outlives an HTTP request.
+
+    Handlers are registered per job kind and called as `handler(payload, report)`,
+    where `await report(**progress)` records progress. A heartbeat renews the
+    lease while the handler runs, and every write after the claim is filtered on
+    the claimed attempt so a run whose lease was taken over cannot touch the job.
+    Jobs are claimed atomically, retried with exponential backoff and picked up
+    again by any worker once a crashed run's lease expires. An idempotency key
+    returns the job already created for it; a singleton job kind has at most one
+    queued or running job at a time."""
+
+    def __init__(self, collection=job_collection, workers=settings.JOB_WORKERS,
+                 max_attempts=JOB_MAX_ATTEMPTS, poll_interval=JOB_POLL_INTERVAL, lease=JOB_LEASE_SECONDS):
+        self.collection = collection
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.handlers = {}
+        self._wake = asyncio.Event()
+        self._tasks = []
+
+    def handler(self, kind: str):
+        def register(func):
+            self.handlers[kind] = func
+            return func
+        return register
+
+    async def enqueue(self, kind: str, payload=None, idempotency_key: str = None, singleton: bool = False):
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        now = datetime.now(timezone.utc)
+        job = {
+            "_id": ObjectId(),
+            "kind": kind,
+            "payload": payload or {},
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "progress": {},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "run_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        if idempotency_key:
+            job["idempotency_key"] = f"{kind}:{idempotency_key}"
+        if singleton:
+            job["active_key"] = kind
+        try:
+            await self.collection.insert_one(job)
+        except DuplicateKeyError:
+            existing = None
+            if idempotency_key:
+                existing = await self.collection.find_one({"idempotency_key": job["idempotency_key"]})
+            if existing is None and singleton:
+                existing = await self.collection.find_one({"active_key": kind})
+            if existing is None:
+                raise
+            return existing
+        self._wake.set()
+        return job
+
+    async def get(self, job_id: str):
+        try:
+            return await self.collection.find_one({"_id": ObjectId(job_id)})
+        except InvalidId:
+            return None
+
+    async def latest(self, kind: str):
+        return await self.collection.find_one({"kind": kind}, sort=[("created_at", DESCENDING)])
+
+    async def _claim(self):
+        now = datetime.now(timezone.utc)
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_at": {"$lte": now}},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": "running", "started_at": now, "lease_until": now + timedelta(seconds=self.lease)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def _owned(job):
+        return {"_id": job["_id"], "attempts": job["attempts"]}
+
+    def _lease_until(self):
+        return datetime.now(timezone.utc) + timedelta(seconds=self.lease)
+
+    async def _heartbeat(self, job):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await self.collection.update_one(self._owned(job), {"$set": {"lease_until": self._lease_until()}})
+            except Exception as e:
+                logger.warning(f"Failed to renew the lease of job {job['_id']}: {e}")
+
+    async def _finish(self, job, status, **fields):
+        await self.collection.update_one(
+            self._owned(job),
+            {
+                "$set": {"status": status, "finished_at": datetime.now(timezone.utc), **fields},
+                "$unset": {"active_key": "", "lease_until": ""},
+            }
+        )
+
+    async def _run(self, job):
+        async def report(**progress):
+            await self.collection.update_one(
+                self._owned(job),
+                {"$set": {"progress": progress, "lease_until": self._lease_until()}}
+            )
+
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            await self._finish(job, "failed", error=f"No handler registered for job kind: {job['kind']}")
+            return
+        if job["attempts"] > job["max_attempts"]:
+            await self._finish(job, "failed", error=job.get("error") or "Job lease expired too many times")
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            result = await handler(job["payload"], report)
+        except asyncio.CancelledError:
+            # shutting down: hand the job back without counting this attempt
+            await self.collection.update_one(
+                self._owned(job),
+                {"$set": {"status": "queued", "run_at": datetime.now(timezone.utc)},
+                 "$inc": {"attempts": -1}, "$unset": {"lease_until": ""}}
+            )
+            raise
+        except Exception as e:
+            logger.exception(f"Job {job['_id']} ({job['kind']}) failed on attempt {job['attempts']}")
+            if job["attempts"] >= job["max_attempts"]:
+                await self._finish(job, "failed", error=str(e))
+            else:
+                run_at = datetime.now(timezone.utc) + timedelta(seconds=retry_delay(job["attempts"]))
+                await self.collection.update_one(
+                    self._owned(job),
+                    {"$set": {"status": "queued", "run_at": run_at, "error": str(e)},
+                     "$unset": {"lease_until": ""}}
+                )
+            return
+        finally:
+            heartbeat.cancel()
+        await self._finish(job, "completed", result=result, error=None)
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.warning(f"Failed to claim a job: {e}")
+                job = None
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+job_queue = JobQueue()
@@ -0,0 +1,100 @@
+import asyncio
+import random
+import time
+from langchain_perplexity import ChatPerplexity
+from langchain_google_genai import ChatGoogleGenerativeAI
+from src.constants import (
+    MODEL_NAME, TEMPERATURE, SEARCH_TEMPERATURE, IMAGE_MODEL_NAME,
+    LLM_CONCURRENCY, LLM_TIMEOUT, LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY
+)
+from src import logger
+from dotenv import load_dotenv
+load_dotenv()
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+DEFAULT_CLIENTS = [
+    ("perplexity", {"model": MODEL_NAME, "temperature": TEMPERATURE}),
+    ("perplexity", {"model": MODEL_NAME, "temperature": SEARCH_TEMPERATURE}),
+    ("perplexity", {"model": "sonar-pro", "temperature": 0}),
+    ("gemini", {"model": IMAGE_MODEL_NAME}),
+]
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status_code in RETRYABLE_STATUS_CODES:
+        return True
+    name = type(error).__name__
+    return any(marker in name for marker in ("RateLimit", "Timeout", "Connection", "ServiceUnavailable"))
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, LLM_RETRY_BASE_DELAY * 2 ** attempt)
+
+
+class LLMClients:
+    """Registry of long-lived chat model clients shared across requests.
+
+    Clients (and their HTTP connection pools) are created once per provider and
+    options, calls are bounded by a per-provider concurrency limit, and every call
+    gets a timeout plus retries with jittered exponential backoff. Tests can swap a
+    provider for a local fake with `override`."""
+
+    def __init__(self):
+        self._factories = {
+            "perplexity": lambda **options: ChatPerplexity(**options),
+            "gemini": lambda **options: ChatGoogleGenerativeAI(**options),
+        }
+        self._clients = {}
+        self._limits = {provider: asyncio.Semaphore(limit) for provider, limit in LLM_CONCURRENCY.items()}
+
+    def get(self, provider: str, **options):
+        key = (provider, tuple(sorted(options.items())))
+        client = self._clients.get(key)
+        if client is None:
+            client = self._factories[provider](**options)
+            self._clients[key] = client
+        return client
+
+    def override(self, provider: str, factory):
+        """Replaces how clients for `provider` are built, e.g. with a fake model"""
+        self._factories[provider] = factory
+        self._clients = {key: client for key, client in self._clients.items() if key[0] != provider}
+
+    def start(self):
+        for provider, options in DEFAULT_CLIENTS:
+            try:
+                self.get(provider, **options)
+            except Exception as e:
+                logger.warning(f"Could not create {provider} client {options}: {e}")
+
+    async def ainvoke(self, provider: str, runnable, input, **kwargs):
+        timeout = LLM_TIMEOUT.get(provider)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                async with self._limits[provider]:
+                    return await asyncio.wait_for(runnable.ainvoke(input, **kwargs), timeout)
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _backoff(attempt)
+                logger.warning(f"{provider} call failed ({type(e).__name__}: {e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def invoke(self, provider: str, runnable, input, **kwargs):
+        """Blocking variant of `ainvoke` for scripts; retries but shares no limiter"""
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                return runnable.invoke(input, **kwargs)
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _backoff(attempt)
+                logger.warning(f"{provider} call failed ({type(e).__name__}: {e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+
+llm_clients = LLMClients()
@@ -1,17 +1,20 @@
 from collections import defaultdict
-from src.constants import INTERACTION_WEIGHTS, DECAY_LAMBDA, WEIGHTS, MMR_LAMBDA, N_VALUE, CANDIDATE_POOL_FACTOR
+from src.constants import INTERACTION_WEIGHTS, DECAY_LAMBDA, MMR_LAMBDA, N_VALUE, CANDIDATE_POOL_FACTOR
+from src.constants import PROFILE_COMPACTION_INTERVAL, PROFILE_MIN_SCORE
 import math
-import random
 from datetime import datetime, timezone
 from dateutil.parser import isoparse
 from pymongo import UpdateOne
+from bson import ObjectId
 from src.utils.common import convert_objectid_to_str
-from src.database.mongo import users_collection, log_collection, hooks_collection, profile_collection
+from src.services.hook_catalog import hook_catalog
+from src.database.mongo import users_collection, hooks_collection, profile_collection
+from src.services.interaction_store import all_user_interactions
+from src.services.job_queue import job_queue
+from src.services.user_cache import user_cache
 from src import logger
 import asyncio
 
-now = datetime.now(timezone.utc)
-
 def compute_interest_score(hook, interaction):
     try:
         now = datetime.now(timezone.utc)
@@ -53,7 +56,93 @@ def enrich_with_explicit_tags(interest_vector, explicit_tags, implicit_tags):
         logger.error(f"Failed to enrich with tags: {e}")
         return interest_vector
 
+def _is_valid_tag(tag):
+    return isinstance(tag, str) and tag != "" and "." not in tag and not tag.startswith("$")
+
+def interest_deltas(hook, interaction, explicit_tags):
+    """Tag -> score contribution of a single interaction to a user's interest vector"""
+    deltas = defaultdict(float)
+    score = compute_interest_score(hook, interaction)
+    for tag in hook.get("tags", []):
+        deltas[tag] += score
+    deltas = enrich_with_explicit_tags(
+        deltas,
+        explicit_tags or [],
+        interaction.get("implicit_tags", [])
+    )
+    return {tag: value for tag, value in deltas.items() if _is_valid_tag(tag)}
+
+async def fetch_explicit_tags(user_ids):
+    """user_id -> explicit tags chosen by the user, in a single query"""
+    object_ids = [ObjectId(user_id) for user_id in set(user_ids) if ObjectId.is_valid(user_id)]
+    if not object_ids:
+        return {}
+    cursor = users_collection.find({"_id": {"$in": object_ids}}, projection={"tags": 1})
+    return {str(user["_id"]): user.get("tags") or [] async for user in cursor}
+
+def _days_since_decay(now):
+    return {"$divide": [{"$subtract": [now, {"$ifNull": ["$last_decayed", now]}]}, 86400000]}
+
+def profile_update(user_id, deltas, now):
+    """Upsert adding interest deltas to a stored profile.
+
+    Stored vectors are expressed as of `last_decayed`, so each delta is scaled up by the
+    decay compact_profiles will apply to it. After the next compaction a delta has only
+    decayed for the time since `now`, however long ago the profile was last compacted."""
+    growth = {"$exp": {"$multiply": [DECAY_LAMBDA, _days_since_decay(now)]}}
+    stage = {"last_updated": now, "last_decayed": {"$ifNull": ["$last_decayed", now]}}
+    for tag, value in deltas.items():
+        stage[f"interest_vector.{tag}"] = {
+            "$add": [{"$ifNull": [f"$interest_vector.{tag}", 0]}, {"$multiply": [value, growth]}]
+        }
+    return UpdateOne({"user_id": user_id}, [{"$set": stage}], upsert=True)
+
+async def compact_profiles(collection=profile_collection, now=None):
+    """Re-applies DECAY_LAMBDA to every stored interest vector for the time elapsed since
+    its last compaction and prunes negligible tags. Runs as a single server-side update,
+    so concurrent deltas are never lost and no interaction history is read."""
+    try:
+        now = now or datetime.now(timezone.utc)
+        decayed_vector = {
+            "$let": {
+                "vars": {"decay": {"$exp": {"$multiply": [-DECAY_LAMBDA, _days_since_decay(now)]}}},
+                "in": {
+                    "$arrayToObject": {
+                        "$filter": {
+                            "input": {
+                                "$map": {
+                                    "input": {"$objectToArray": {"$ifNull": ["$interest_vector", {}]}},
+                                    "as": "kv",
+                                    "in": {"k": "$$kv.k", "v": {"$multiply": ["$$kv.v", "$$decay"]}}
+                                }
+                            },
+                            "as": "kv",
+                            "cond": {"$gte": [{"$abs": "$$kv.v"}, PROFILE_MIN_SCORE]}
+                        }
+                    }
+                }
+            }
+        }
+        result = await collection.update_many(
+            {},
+            [{"$set": {"interest_vector": decayed_vector, "last_decayed": now}}]
+        )
+        logger.info(f"Compacted {result.modified_count} interest profiles")
+    except Exception as e:
+        logger.exception(f"Failed to compact profiles: {e}")
+
+async def run_profile_compaction(interval=PROFILE_COMPACTION_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        await compact_profiles()
+
 async def update_profile():
+    """Full rebuild of every interest vector from the complete interaction history.
+    Only needed for backfills; the feed relies on profile_update and compact_profiles.
+
+    Returns:
+        int: number of profiles rewritten
+    """
     try:
         hooks_cursor = hooks_collection.find(
             {},
@@ -61,15 +150,14 @@ async def update_profile():
         )
         hooks = {str(h["_id"]): h async for h in hooks_cursor}
 
-        logs_cursor = log_collection.find()
         user_logs = defaultdict(list)
-        async for log in logs_cursor:
-            for interaction in log.get("interactions", []):
-                user_logs[log["user_id"]].append(interaction)
+        async for user_id, interaction in all_user_interactions():
+            user_logs[user_id].append(interaction)
 
         users_cursor = users_collection.find()
         users = {str(u["_id"]): u async for u in users_cursor}
 
+        now = datetime.now(timezone.utc)
         updates = []
 
         for user_id, interactions in user_logs.items():
@@ -82,14 +170,8 @@ async def update_profile():
                     hook = hooks.get(interaction["hook_id"])
                     if not hook:
                         continue
-                    score = compute_interest_score(hook, interaction)
-                    for tag in hook.get("tags", []):
-                        interest_vector[tag] += score
-                    interest_vector = enrich_with_explicit_tags(
-                        interest_vector,
-                        explicit_tags,
-                        interaction.get("implicit_tags", [])
-                    )
+                    for tag, value in interest_deltas(hook, interaction, explicit_tags).items():
+                        interest_vector[tag] += value
                 except Exception as e:
                     logger.warning(f"Skipping faulty interaction: {e}")
 
@@ -98,46 +180,23 @@ async def update_profile():
                 {"$set": {
                     "user_id": user_id,
                     "interest_vector": dict(interest_vector),
-                    "last_updated": now
+                    "last_updated": now,
+                    "last_decayed": now
                 }},
                 upsert=True
             ))
 
         if updates:
             await profile_collection.bulk_write(updates)
+            await user_cache.invalidate_profile(*user_logs)
+        return len(updates)
     except Exception as e:
         logger.exception(f"Failed to update profile: {e}")
+        raise
 
-def compute_reranked_score(hook, base_score, max_views=1):
-    try:
-        now = datetime.now(timezone.utc)
-        created_at_str = hook.get("metadata", {}).get("createdAt")
-        try:
-            created_at = isoparse(created_at_str)
-            if created_at.tzinfo is None:
-                created_at = created_at.replace(tzinfo=timezone.utc)
-        except Exception:
-            created_at = now
-
-        days_old = (now - created_at).days
-        recency_score = math.exp(-days_old / 7)
-
-        views = hook.get("views", 0)
-        popularity_score = views / max_views if max_views else 0
-
-        exploration_bonus = random.uniform(0.01, 0.1)
-
-        total_score = (
-            WEIGHTS["base_score"] * base_score +
-            WEIGHTS["recency"] * recency_score +
-            WEIGHTS["popularity"] * popularity_score +
-            WEIGHTS["exploration_bonus"] * exploration_bonus
-        )
-
-        return total_score
-    except Exception as e:
-        logger.error(f"Failed to compute reranked score: {e}")
-        return 0.0
+@job_queue.handler("profile_rebuild")
+async def run_profile_rebuild(payload, report):
+    return {"profiles": await update_profile()}
 
 def jaccard_similarity(tags1, tags2):
     try:
@@ -149,31 +208,60 @@ def jaccard_similarity(tags1, tags2):
         logger.error(f"Failed to compute Jaccard similarity: {e}")
         return 0.0
 
+def tag_bitsets(hooks):
+    """Encodes each hook's tags as an integer bitset so set operations become bitwise ops"""
+    bits = {}
+    masks = []
+    for hook in hooks:
+        mask = 0
+        for tag in hook.get("tags", []):
+            mask |= 1 << bits.setdefault(tag, len(bits))
+        masks.append(mask)
+    return masks
+
 def apply_mmr(scored_hooks, N, lambda_param):
+    """Maximal marginal relevance selection, equivalent to scoring every candidate with
+    jaccard_similarity against the selected set. Each candidate keeps a running max
+    similarity that is only updated against the most recently selected hook."""
     try:
-        selected = []
+        relevance = {}
+        for score, hook in scored_hooks:
+            relevance.setdefault(hook["_id"], score)
+
         candidates = [hook for _, hook in scored_hooks]
+        rel_scores = [relevance[hook["_id"]] for hook in candidates]
+        masks = tag_bitsets(candidates)
+        sizes = [mask.bit_count() for mask in masks]
+        max_sim = [0.0] * len(candidates)
+        remaining = list(range(len(candidates)))
+        selected = []
 
-        while len(selected) < N and candidates:
+        while len(selected) < N and remaining:
             best_score = float("-inf")
-            best_hook = None
-
-            for hook in candidates:
-                rel_score = next(score for score, h in scored_hooks if h["_id"] == hook["_id"])
-                sim_score = max(
-                    jaccard_similarity(hook.get("tags", []), other.get("tags", []))
-                    for other in selected
-                ) if selected else 0
-
-                mmr_score = lambda_param * rel_score - (1 - lambda_param) * sim_score
-
+            best = None
+            for i in remaining:
+                mmr_score = lambda_param * rel_scores[i] - (1 - lambda_param) * max_sim[i]
                 if mmr_score > best_score:
                     best_score = mmr_score
-                    best_hook = hook
-
-            if best_hook:
-                selected.append(best_hook)
-                candidates = [c for c in candidates if c["_id"] != best_hook["_id"]]
+                    best = i
+
+            if best is None:
+                break
+            best_hook = candidates[best]
+            selected.append(best_hook)
+            best_mask = masks[best]
+            remaining = [i for i in remaining if candidates[i]["_id"] != best_hook["_id"]]
+
+            if not sizes[best]:
+                continue
+            for i in remaining:
+                if not sizes[i]:
+                    continue
+                intersection = (masks[i] & best_mask).bit_count()
+                if intersection:
+                    sim = intersection / (masks[i] | best_mask).bit_count()
+                    if sim > max_sim[i]:
+                        max_sim[i] = sim
 
         return selected
     except Exception as e:
@@ -183,40 +271,27 @@ def apply_mmr(scored_hooks, N, lambda_param):
 async def get_candidate_hooks(user_interest_vector, N=100, lambda_param=0.7):
     try:
         K = N * CANDIDATE_POOL_FACTOR
-        all_hooks_cursor = hooks_collection.find({},
-            projection={"image_base64": 0}
-        )
-        all_hooks = []
-        max_views = 1
-
-        async for hook in all_hooks_cursor:
-            views = hook['metadata'].get('viewCount', 0)
-            max_views = max(max_views, views)
-            all_hooks.append(hook)
-
-        scored_hooks = []
-        for hook in all_hooks:
-            try:
-                tags = hook.get("tags", [])
-                base_score = sum(user_interest_vector.get(tag, 0) for tag in tags)
-                reranked_score = compute_reranked_score(hook, base_score, max_views)
-                scored_hooks.append((reranked_score, hook))
-            except Exception as e:
-                logger.warning(f"Failed scoring a hook: {e}")
-
-        scored_hooks.sort(reverse=True, key=lambda x: x[0])
-        top_k = scored_hooks[:K]
+        matrix = hook_catalog.matrix()
+        scores = matrix.score(user_interest_vector)
+        top_k = [(float(scores[i]), matrix.hooks[i]) for i in matrix.top_k(scores, K)]
         diversified = apply_mmr(top_k, N, lambda_param)
 
-        return diversified
+        ids = [hook["_id"] for hook in diversified]
+        docs = await hooks_collection.find(
+            {"_id": {"$in": ids}},
+            projection={"image_base64": 0}
+        ).to_list(length=len(ids))
+        by_id = {doc["_id"]: doc for doc in docs}
+
+        return [by_id[hook_id] for hook_id in ids if hook_id in by_id]
     except Exception as e:
         logger.exception(f"Failed to get candidate hooks: {e}")
         return []
 
 async def generate_mpad_feed(user_id, N=N_VALUE):
     try:
-        user_profile = await profile_collection.find_one({"user_id": user_id})
-        interest_vector = user_profile.get("interest_vector", {})
+        user_profile = await user_cache.get_profile(user_id)
+        interest_vector = (user_profile or {}).get("interest_vector", {})
 
         diversified = await get_candidate_hooks(
             user_interest_vector=interest_vector,
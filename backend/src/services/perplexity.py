@@ -1,51 +1,71 @@
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_perplexity import ChatPerplexity
 from langchain_core.output_parsers import JsonOutputParser
 from pathlib import Path
 from pydantic import create_model, BaseModel
 from src.constants import MODEL_NAME, TEMPERATURE
 from src.utils.common import load_json
-from src.utils.model import extract_valid_json
+from src.utils.model import extract_valid_json, parse_structured_output
+from src.services.llm import llm_clients
 from src import logger
+from collections import Counter
 from dotenv import load_dotenv
 load_dotenv()
 
+# How reasoning-model responses were turned into structured output:
+# "local" validated as-is, "repaired" validated after repair, "fallback" needed sonar-pro
+structured_output_stats = Counter(local=0, repaired=0, fallback=0)
+
 class PPLX:
     def __init__(self, model_name=MODEL_NAME, temperature:int=TEMPERATURE):
-        self.chat = ChatPerplexity(
-            temperature=temperature,
-            model=model_name
-        )
+        self.chat = llm_clients.get("perplexity", model=model_name, temperature=temperature)
 
     def set_template(self, system_msg:str):
         self.template = ChatPromptTemplate.from_messages([
             ('system', system_msg),
             ('human', '{input}')
         ])
-        
+
+    def _sonar_pro(self, schema:dict):
+        return llm_clients.get("perplexity", model="sonar-pro", temperature=0).with_structured_output(schema=schema)
+
+    def _parse_locally(self, content:str, schema:dict):
+        """Validates a reasoning model's answer against the schema so the structured
+        sonar-pro call is only made when local parsing and repair fail"""
+        result, repaired = parse_structured_output(content, schema)
+        if result is None:
+            structured_output_stats["fallback"] += 1
+            logger.info("Reasoning output failed schema validation, falling back to sonar-pro")
+        else:
+            structured_output_stats["repaired" if repaired else "local"] += 1
+        return result
+
     def get_prompt(self, input:str, schema:dict):
+        prompt = self.template.invoke({"input": input})
         if self.chat.model == 'sonar-pro':
-            model = self.chat.with_structured_output(schema=schema)
-            prompt = self.template.invoke({
-            "input": input,
-            "format_instructions": None
-            })  
-            response = model.invoke(prompt)
-            print("\n\n",response,"\n\n")
+            response = llm_clients.invoke("perplexity", self.chat.with_structured_output(schema=schema), prompt)
+            logger.debug("Perplexity response: %s", response)
             return response
 
-        sonar_pro_chat = ChatPerplexity(
-            temperature=0,
-            model="sonar-pro"
-        ).with_structured_output(schema=schema)
-        prompt = self.template.invoke({
-        "input": input
-        })
-        response = self.chat.invoke(prompt)
-        print("\n\n",response,"\n\n")
-        prompt_for_sonar = extract_valid_json(response.content)
-        result = sonar_pro_chat.invoke(prompt_for_sonar)
-        return result
+        response = llm_clients.invoke("perplexity", self.chat, prompt)
+        logger.debug("Perplexity response: %s", response)
+        result = self._parse_locally(response.content, schema)
+        if result is not None:
+            return result
+        return llm_clients.invoke("perplexity", self._sonar_pro(schema), response.content)
+
+    async def aget_prompt(self, input:str, schema:dict):
+        prompt = self.template.invoke({"input": input})
+        if self.chat.model == 'sonar-pro':
+            response = await llm_clients.ainvoke("perplexity", self.chat.with_structured_output(schema=schema), prompt)
+            logger.debug("Perplexity response: %s", response)
+            return response
+
+        response = await llm_clients.ainvoke("perplexity", self.chat, prompt)
+        logger.debug("Perplexity response: %s", response)
+        result = self._parse_locally(response.content, schema)
+        if result is not None:
+            return result
+        return await llm_clients.ainvoke("perplexity", self._sonar_pro(schema), response.content)
 
 
 if __name__ == "__main__":    
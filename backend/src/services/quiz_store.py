@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timezone
+from src.constants import QUIZ_PROMPT_VERSION, QUIZ_CACHE_SIZE, QUIZ_REFRESH_AGE
+from src.database.mongo import quiz_collection
+from src.services.game import generate_quiz
+from src.utils.cache import LRUCache
+from src.utils.common import parse_timestamp
+from src import logger
+
+
+class QuizStore:
+    """Quizzes generated once per hook and prompt version.
+
+    Reads go memory LRU -> `quizzes` collection -> Perplexity, and concurrent
+    requests for the same hook share a single generation. Quizzes older than
+    `refresh_age` are still served while a replacement is generated in the background."""
+
+    def __init__(self, collection=quiz_collection, max_size=QUIZ_CACHE_SIZE,
+                 refresh_age=QUIZ_REFRESH_AGE, prompt_version=QUIZ_PROMPT_VERSION):
+        self.collection = collection
+        self.refresh_age = refresh_age
+        self.prompt_version = prompt_version
+        self._cache = LRUCache(max_size)
+        self._inflight = {}
+
+    def _is_stale(self, entry):
+        age = datetime.now(timezone.utc) - entry["generated_at"]
+        return age.total_seconds() > self.refresh_age
+
+    async def _generate(self, hook_id, hook):
+        quiz = await generate_quiz(hook)
+        entry = {"quiz": quiz, "generated_at": datetime.now(timezone.utc)}
+        await self.collection.update_one(
+            {"hook_id": hook_id, "prompt_version": self.prompt_version},
+            {"$set": entry},
+            upsert=True
+        )
+        self._cache.set(hook_id, entry)
+        return quiz
+
+    def _generate_once(self, hook_id, hook):
+        task = self._inflight.get(hook_id)
+        if task is None:
+            task = asyncio.create_task(self._generate(hook_id, hook))
+            self._inflight[hook_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(hook_id, None))
+        return task
+
+    def _refresh(self, hook_id, hook):
+        def log_failure(task):
+            if not task.cancelled() and task.exception():
+                logger.warning(f"Background quiz refresh failed for hook {hook_id}: {task.exception()}")
+        self._generate_once(hook_id, hook).add_done_callback(log_failure)
+
+    async def get(self, hook):
+        """Quiz for a hook document (needs _id, headline, hookText and expandedContent)"""
+        hook_id = str(hook["_id"])
+        entry = self._cache.get(hook_id)
+        if entry is None:
+            doc = await self.collection.find_one(
+                {"hook_id": hook_id, "prompt_version": self.prompt_version},
+                projection={"quiz": 1, "generated_at": 1}
+            )
+            if doc:
+                entry = {"quiz": doc["quiz"], "generated_at": parse_timestamp(doc["generated_at"])}
+                self._cache.set(hook_id, entry)
+
+        if entry is None:
+            return await asyncio.shield(self._generate_once(hook_id, hook))
+        if self._is_stale(entry):
+            self._refresh(hook_id, hook)
+        return entry["quiz"]
+
+    def invalidate(self, hook_id):
+        self._cache.pop(str(hook_id))
+
+
+quiz_store = QuizStore()
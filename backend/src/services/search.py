@@ -0,0 +1,119 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from bson import ObjectId
+from src.config.game import SEARCH_XP
+from src.constants import SCHEMA_DIR, SEARCH_TEMPERATURE
+from src.database.mongo import hooks_collection
+from src.services.game import update_xp
+from src.services.gemini import GEMINI
+from src.services.hook_catalog import hook_catalog
+from src.services.image_index import image_index
+from src.services.perplexity import PPLX
+from src.services.quiz_store import quiz_store
+from src.services.search_cache import search_cache
+from src.utils.common import load_json, convert_objectid_to_str
+from src import logger
+
+SEARCH_SYSTEM_MESSAGE = "You are a creative content writer who generates eye-catching, educational hooks based on user input."
+
+_background_tasks = set()
+
+
+async def generate_search_text(q: str):
+    validation_schema = load_json(SCHEMA_DIR / "feed_response.json")
+    pplx = PPLX(temperature=SEARCH_TEMPERATURE)
+    pplx.set_template(system_msg=SEARCH_SYSTEM_MESSAGE)
+
+    hook = await pplx.aget_prompt(
+        schema=validation_schema,
+        input=f"Generate a creative and informative hook based on: '{q}'. Give variety from other results."
+    )
+
+    hook["category"] = hook.get("category", "Search")
+    hook["tags"] = [tag.strip().lower() for tag in hook.get("tags", [])] or ["misc"]
+    hook["search"] = search_cache.remember(q)
+    hook["metadata"] = {
+        "createdAt": datetime.now(timezone.utc).isoformat() + "Z",
+        "popularity": 1,
+        "saveCount": random.randint(1, 50),
+        "shareCount": random.randint(1, 100),
+        "likeCount": random.randint(5, 500),
+        "viewCount": random.randint(5, 500),
+        "viral": random.randint(0, 1)
+    }
+    return hook
+
+
+async def _image_stage(hook):
+    image_url, image_srcset = None, None
+    image_prompt = hook.get("img_desc")
+    if image_prompt:
+        try:
+            image_url, image_srcset = await image_index.render(image_prompt, GEMINI())
+            await hooks_collection.update_one(
+                {"_id": ObjectId(hook["_id"])},
+                {"$set": {"image_url": image_url, "image_srcset": image_srcset}}
+            )
+        except Exception as img_err:
+            logger.warning(f"Image generation failed: {img_err}")
+            image_url, image_srcset = None, None
+    return "image", {"_id": hook["_id"], "image_url": image_url, "image_srcset": image_srcset}
+
+
+async def _quiz_stage(hook):
+    try:
+        quiz = await quiz_store.get(hook)
+    except Exception as quiz_err:
+        logger.warning(f"Quiz generation failed: {quiz_err}")
+        quiz = None
+    return "quiz", {"_id": hook["_id"], "quiz": quiz}
+
+
+async def search_events(profile_id: str, q: str, fresh: bool = False):
+    """Runs a search and yields (event, payload) as each stage completes: "hook" with
+    the text fields, then "image" and "quiz" in whichever order they finish, then "done".
+
+    A recent matching hook from the search cache is served unless `fresh` is set;
+    otherwise the hook is stored right after text generation and the image and quiz
+    stages run concurrently."""
+    cached = None if fresh else await search_cache.lookup(q)
+    if cached:
+        hook = convert_objectid_to_str(cached)
+        yield "hook", hook
+        stages = [asyncio.create_task(_quiz_stage(hook))]
+    else:
+        logger.info("Generating a hook for search query: %s", q)
+        hook = await generate_search_text(q)
+        await hooks_collection.insert_one(hook)
+        hook_catalog.put(hook)
+        hook["_id"] = str(hook["_id"])
+        yield "hook", dict(hook)
+        stages = [asyncio.create_task(_image_stage(hook)), asyncio.create_task(_quiz_stage(hook))]
+
+    try:
+        for finished in asyncio.as_completed(stages):
+            yield await finished
+    finally:
+        # let stages outlive a client that disconnected mid-stream so their writes land
+        for task in stages:
+            if not task.done():
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+
+    try:
+        await update_xp(user_id=profile_id, xp=SEARCH_XP)
+    except Exception:
+        logger.error(f"User with {profile_id} had some trouble updating xp")
+    yield "done", {"_id": hook["_id"]}
+
+
+async def search_hook(profile_id: str, q: str, fresh: bool = False):
+    """Runs every search stage and returns the assembled hook"""
+    hook = None
+    async for event, payload in search_events(profile_id, q, fresh):
+        if event == "hook":
+            hook = payload
+        elif event in ("image", "quiz"):
+            hook.update({key: value for key, value in payload.items() if key != "_id"})
+    return hook
@@ -0,0 +1,88 @@
+import random
+import re
+import unicodedata
+from datetime import datetime, timezone, timedelta
+from pymongo import DESCENDING
+from src.constants import (
+    SEARCH_CACHE_FRESHNESS, SEARCH_CACHE_SIZE, SEARCH_SIMILARITY_THRESHOLD, SEARCH_CACHE_VARIANTS
+)
+from src.database.mongo import hooks_collection
+from src.utils.cache import LRUCache
+from src import logger
+
+
+def normalize_query(query: str) -> str:
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = re.sub(r"[^\w\s]", " ", query)
+    return " ".join(query.split())
+
+
+def trigrams(text: str) -> frozenset:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def trigram_similarity(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class SearchCache:
+    """Serves hooks generated for recent, equivalent searches from the hooks collection.
+
+    Generated search hooks carry a `search` field with the normalized query. A lookup
+    matches the normalized query exactly, plus any recently seen query whose character
+    trigram similarity reaches `threshold`."""
+
+    def __init__(self, collection=hooks_collection, freshness=SEARCH_CACHE_FRESHNESS,
+                 threshold=SEARCH_SIMILARITY_THRESHOLD, max_queries=SEARCH_CACHE_SIZE,
+                 variants=SEARCH_CACHE_VARIANTS):
+        self.collection = collection
+        self.freshness = freshness
+        self.threshold = threshold
+        self.variants = variants
+        self._queries = LRUCache(max_queries, ttl=freshness)
+
+    def _similar_queries(self, normalized):
+        grams = trigrams(normalized)
+        matches = []
+        for query, query_grams in self._queries.values():
+            score = trigram_similarity(grams, query_grams)
+            if query != normalized and score >= self.threshold:
+                matches.append((score, query))
+        return [query for _, query in sorted(matches, reverse=True)]
+
+    async def lookup(self, query: str):
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        candidates = [normalized] + self._similar_queries(normalized)
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.freshness)
+
+        hooks = await self.collection.find(
+            {"search.query": {"$in": candidates}, "search.createdAt": {"$gte": since}},
+            projection={"image_base64": 0},
+            sort=[("search.createdAt", DESCENDING)]
+        ).limit(self.variants).to_list(length=self.variants)
+
+        if not hooks:
+            return None
+        logger.info(f"Search cache hit for '{normalized}'")
+        return random.choice(hooks)
+
+    def remember(self, query: str):
+        """Records a freshly generated search and returns the `search` field to store on its hook"""
+        normalized = normalize_query(query)
+        self._queries.set(normalized, (normalized, trigrams(normalized)))
+        return {"query": normalized, "createdAt": datetime.now(timezone.utc)}
+
+    async def load(self):
+        """Seeds near-duplicate matching with queries searched within the freshness window"""
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.freshness)
+        queries = await self.collection.distinct("search.query", {"search.createdAt": {"$gte": since}})
+        for normalized in queries[-self._queries.maxsize:]:
+            self._queries.set(normalized, (normalized, trigrams(normalized)))
+
+
+search_cache = SearchCache()
@@ -1,46 +1,105 @@
-from src.constants import POPULARITY_WEIGHTS
+from src.constants import POPULARITY_WEIGHTS, POPULARITY_BATCH_SIZE, POPULARITY_REFRESH_INTERVAL
+import asyncio
 import numpy as np
 from datetime import datetime, timezone
+from pymongo import UpdateOne
 from src.database.mongo import hooks_collection
+from src.services.job_queue import job_queue
+from src.services.trending import trending_leaderboard
+from src.utils.common import parse_timestamp
 from src import logger
-from dateutil.parser import parse as parse_date
-import re
 
-def decayed_score(hook):
-    try:
-        now = datetime.now(timezone.utc)
-        created_str = hook["metadata"]["createdAt"]
+POPULARITY_PROJECTION = {
+    "metadata.createdAt": 1,
+    **{f"metadata.{field}": 1 for field in POPULARITY_WEIGHTS},
+}
+
+def _epoch(value):
+    created = parse_timestamp(value)
+    return created.timestamp() if created else np.nan
 
-            # Remove both if both are present
-        if re.search(r'\+00:00Z$', created_str):
-            created_str = created_str.replace('+00:00Z', '+00:00')
-        elif created_str.endswith('Z') and '+00:00' in created_str:
-            created_str = created_str.replace('Z', '')  # Remove Z only
 
-        created = parse_date(created_str)
+def decayed_scores(metadatas, now=None):
+    """Vectorized popularity for a chunk of hook metadata documents. Hooks whose
+    createdAt cannot be parsed score 0."""
+    now = (now or datetime.now(timezone.utc)).timestamp()
+    created = np.array([_epoch(metadata.get("createdAt")) for metadata in metadatas], dtype=np.float64)
 
-        age_days = max((now - created).total_seconds() / 86400, 1)
+    raw = np.zeros(len(metadatas), dtype=np.float64)
+    for field, weight in POPULARITY_WEIGHTS.items():
+        raw += weight * np.array([metadata.get(field, 0) or 0 for metadata in metadatas], dtype=np.float64)
 
-        weights = POPULARITY_WEIGHTS
-        raw = sum(hook["metadata"].get(k, 0) * v for k, v in weights.items())
-        decay = 1 / (1 + np.log(age_days))
+    age_days = np.maximum((now - created) / 86400, 1)
+    scores = raw / (1 + np.log(age_days))
+    return np.where(np.isnan(created), 0.0, scores)
 
-        return raw * decay
+
+def decayed_score(hook):
+    try:
+        return float(decayed_scores([hook["metadata"]])[0])
     except Exception:
         logger.exception(f"Error computing decayed score for hook ID {hook.get('_id', 'unknown')}")
         return 0
 
 
-async def update_popularity():
-    try:
-        async for hook in hooks_collection.find():
-            try:
-                popularity = decayed_score(hook)
-                hooks_collection.update_one(
-                    {'_id': hook['_id']},
-                    {'$set': {'metadata.popularity': round(popularity, 3)}}
-                )
-            except Exception as e:
-                logger.exception(f"Failed to update popularity for hook ID {hook.get('_id', 'unknown')}")
-    except Exception as e:
-        logger.exception("Failed to iterate through hooks collection for popularity update")
+async def _flush(batch):
+    scores = decayed_scores([hook.get("metadata") or {} for hook in batch])
+    await hooks_collection.bulk_write([
+        UpdateOne({'_id': hook['_id']}, {'$set': {'metadata.popularity': round(float(score), 3)}})
+        for hook, score in zip(batch, scores)
+    ], ordered=False)
+
+
+async def update_popularity(batch_size=POPULARITY_BATCH_SIZE, progress=None):
+    """Recomputes metadata.popularity for every hook, streaming a narrow projection
+    and writing each chunk with a single unordered bulk_write.
+
+    Args:
+        batch_size (int): hooks scored and written per bulk_write
+        progress (coroutine function, optional): awaited with (processed, total) after each chunk
+
+    Returns:
+        int: number of hooks updated
+    """
+    total = await hooks_collection.estimated_document_count()
+    processed = 0
+    batch = []
+    async for hook in hooks_collection.find({}, projection=POPULARITY_PROJECTION, batch_size=batch_size):
+        batch.append(hook)
+        if len(batch) >= batch_size:
+            await _flush(batch)
+            processed += len(batch)
+            batch = []
+            if progress:
+                await progress(processed, total)
+    if batch:
+        await _flush(batch)
+        processed += len(batch)
+        if progress:
+            await progress(processed, total)
+    logger.info(f"Updated popularity for {processed} hooks")
+    return processed
+
+
+@job_queue.handler("popularity")
+async def run_popularity_job(payload, report):
+    async def progress(processed, total):
+        await report(processed=processed, total=max(total, processed))
+
+    processed = await update_popularity(progress=progress)
+    await trending_leaderboard.rebuild()
+    return {"processed": processed}
+
+
+async def schedule_popularity_job():
+    """Queues a recompute unless one is already queued or running"""
+    return await job_queue.enqueue("popularity", singleton=True)
+
+
+async def run_popularity_schedule(interval=POPULARITY_REFRESH_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await schedule_popularity_job()
+        except Exception:
+            logger.exception("Failed to schedule popularity recompute")
@@ -0,0 +1,69 @@
+import asyncio
+import hashlib
+import time
+from pymongo import DESCENDING
+from src.constants import TRENDING_MAX_N, TRENDING_TTL
+from src.database.mongo import hooks_feed_collection
+from src.utils.common import convert_objectid_to_str
+from src import logger
+
+
+class TrendingLeaderboard:
+    """In-memory snapshot of the top hooks by metadata.popularity.
+
+    Rebuilt whenever popularity is recomputed; once older than `ttl` it keeps being
+    served while a refresh runs in the background, so requests never wait on Mongo
+    after the first build."""
+
+    def __init__(self, collection=hooks_feed_collection, max_size=TRENDING_MAX_N, ttl=TRENDING_TTL):
+        self.collection = collection
+        self.max_size = max_size
+        self.ttl = ttl
+        self._hooks = None
+        self._digest = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task = None
+
+    async def rebuild(self):
+        async with self._lock:
+            docs = await self.collection.find(
+                {},
+                sort=[("metadata.popularity", DESCENDING)],
+                projection={"image_base64": 0}
+            ).limit(self.max_size).to_list(length=self.max_size)
+
+            hooks = [convert_objectid_to_str(doc) for doc in docs]
+            digest = hashlib.sha1()
+            for hook in hooks:
+                digest.update(f"{hook['_id']}:{hook.get('metadata', {}).get('popularity')};".encode())
+
+            self._hooks = hooks
+            self._digest = digest.hexdigest()[:16]
+            self._built_at = time.monotonic()
+            logger.info(f"Trending leaderboard rebuilt with {len(hooks)} hooks")
+
+    async def _refresh(self):
+        try:
+            await self.rebuild()
+        except Exception:
+            logger.exception("Failed to refresh trending leaderboard")
+
+    async def start(self):
+        await self._refresh()
+
+    def is_stale(self):
+        return time.monotonic() - self._built_at > self.ttl
+
+    async def get(self, n):
+        """Returns the top `n` hooks (capped at max_size) and their ETag"""
+        if self._hooks is None:
+            await self.rebuild()
+        elif self.is_stale() and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+        n = max(0, min(n, self.max_size))
+        return self._hooks[:n], f'W/"{self._digest}-{n}"'
+
+
+trending_leaderboard = TrendingLeaderboard()
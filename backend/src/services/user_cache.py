@@ -0,0 +1,156 @@
+import copy
+import time
+from abc import ABC, abstractmethod
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from src.config.common_setting import settings
+from src.constants import USER_CACHE_SIZE, USER_CACHE_TTL, PROFILE_CACHE_TTL
+from src.database.mongo import users_collection, profile_collection
+from src.utils.cache import LRUCache
+from src import logger
+
+# credentials never leave Mongo, so cached users are safe to hand to a shared tier
+USER_PROJECTION = {"password_hash": 0, "verification_token": 0}
+CODEC_OPTIONS = CodecOptions(tz_aware=True)
+
+
+class SharedCache(ABC):
+    """Interface for a cache shared between processes (e.g. Redis or memcached).
+    Values are BSON documents, so ObjectIds and datetimes survive the round trip."""
+
+    @abstractmethod
+    async def get(self, key: str):
+        """Cached document, or None on a miss"""
+
+    @abstractmethod
+    async def set(self, key: str, value: dict, ttl: float):
+        """Stores `value` for `ttl` seconds"""
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        """Removes `keys` for every process using the cache"""
+
+
+class InProcessCacheTier(SharedCache):
+    """SharedCache implementation that lives in this process only, used in tests and
+    local development. Nothing is shared between workers: entries and invalidations
+    made here are invisible to other processes, so multi-worker deployments need a
+    real shared backend."""
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        payload, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return bson.decode(payload, codec_options=CODEC_OPTIONS)
+
+    async def set(self, key: str, value: dict, ttl: float):
+        self._data[key] = (bson.encode(value), time.monotonic() + ttl)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._data.pop(key, None)
+
+
+def build_shared_cache():
+    if settings.USER_CACHE_SHARED_BACKEND == "memory":
+        return InProcessCacheTier()
+    return None
+
+
+class UserCache:
+    """Read-through cache for user documents and interest profiles.
+
+    Lookups try the per-process LRU, then the optional shared tier, then Mongo.
+    Every code path that writes a user or profile calls `invalidate_user` or
+    `invalidate_profile` afterwards, so the next read fetches the new document.
+    Callers get their own copy, so mutating a returned document never changes the cache."""
+
+    def __init__(self, users=users_collection, profiles=profile_collection, shared: SharedCache = None,
+                 maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL, profile_ttl=PROFILE_CACHE_TTL):
+        self.users = users
+        self.profiles = profiles
+        self.shared = shared
+        self.ttl = ttl
+        self.profile_ttl = profile_ttl
+        self._local = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    async def _get(self, key, ttl, load):
+        doc = self._local.get(key)
+        if doc is not None:
+            self.hits += 1
+            return copy.deepcopy(doc)
+        if self.shared is not None:
+            try:
+                doc = await self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared user cache read failed for {key}: {e}")
+        if doc is None:
+            self.misses += 1
+            doc = await load()
+            if doc is None:
+                return None
+            await self._share(key, doc, ttl)
+        else:
+            self.hits += 1
+        self._local.set(key, doc, ttl=ttl)
+        return copy.deepcopy(doc)
+
+    async def _share(self, key, doc, ttl):
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, doc, ttl)
+            except Exception as e:
+                logger.warning(f"Shared user cache write failed for {key}: {e}")
+
+    async def _drop(self, *keys):
+        for key in keys:
+            self._local.pop(key)
+        if self.shared is not None:
+            try:
+                await self.shared.delete(*keys)
+            except Exception as e:
+                logger.warning(f"Shared user cache delete failed for {keys}: {e}")
+
+    async def get_user(self, user_id):
+        """User document without credentials, or None if it does not exist"""
+        return await self._get(
+            f"user:{user_id}", self.ttl,
+            lambda: self.users.find_one({"_id": ObjectId(user_id)}, projection=USER_PROJECTION)
+        )
+
+    async def get_profile(self, user_id):
+        """Interest profile of the user, or None before their first interaction"""
+        return await self._get(
+            f"profile:{user_id}", self.profile_ttl,
+            lambda: self.profiles.find_one({"user_id": str(user_id)}, projection={"interest_vector": 1})
+        )
+
+    async def put_user(self, user):
+        """Caches a user document that was just read or written elsewhere"""
+        user = {key: value for key, value in user.items() if key not in USER_PROJECTION}
+        key = f"user:{user['_id']}"
+        self._local.set(key, user, ttl=self.ttl)
+        await self._share(key, user, self.ttl)
+
+    async def invalidate_user(self, user_id):
+        await self._drop(f"user:{user_id}")
+
+    async def invalidate_profile(self, *user_ids):
+        await self._drop(*(f"profile:{user_id}" for user_id in user_ids))
+
+    def metrics(self):
+        return {"entries": len(self._local), "hits": self.hits, "misses": self.misses,
+                "shared": type(self.shared).__name__ if self.shared is not None else None}
+
+
+user_cache = UserCache(shared=build_shared_cache())
@@ -0,0 +1,56 @@
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry once `maxsize`
+    is exceeded. Entries can optionally expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def _expired(self, expires_at):
+        return expires_at is not None and expires_at <= time.monotonic()
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if self._expired(expires_at):
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def peek(self, key, default=None):
+        item = self._data.get(key)
+        if item is None or self._expired(item[1]):
+            return default
+        return item[0]
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def values(self):
+        return [value for value, expires_at in self._data.values() if not self._expired(expires_at)]
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return self.peek(key) is not None
+
+    def __len__(self):
+        return len(self._data)
@@ -6,6 +6,8 @@ from ensure import ensure_annotations
 from box import ConfigBox
 from pathlib import Path
 from typing import Any
+from datetime import datetime, timezone
+from dateutil.parser import isoparse
 from box.exceptions import BoxValueError
 
 @ensure_annotations
@@ -81,4 +83,26 @@ def convert_objectid_to_str(doc):
     doc = dict(doc)  # copy so you don't modify original
     if "_id" in doc:
         doc["_id"] = str(doc["_id"])
-    return doc
\ No newline at end of file
+    return doc
+
+def parse_timestamp(value):
+    """parse a stored createdAt value into an aware UTC datetime
+
+    Args:
+        value (str | datetime): ISO-8601 string or datetime, tolerating the
+            "+00:00Z" suffix written by the hook generators
+
+    Returns:
+        datetime: timezone aware datetime, or None if it cannot be parsed
+    """
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if not isinstance(value, str):
+        return None
+    if value.endswith("Z") and ("+" in value[10:] or "-" in value[10:]):
+        value = value[:-1]
+    try:
+        parsed = isoparse(value)
+    except (ValueError, OverflowError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
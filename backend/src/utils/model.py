@@ -1,5 +1,6 @@
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+from jsonschema import Draft7Validator
 
 def extract_valid_json(content: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -52,4 +53,65 @@ def extract_valid_json(content: Dict[str, Any]) -> Dict[str, Any]:
         parsed_json = json.loads(json_str)
         return parsed_json
     except json.JSONDecodeError as e:
-        raise ValueError("Failed to parse valid JSON from response content") from e
\ No newline at end of file
+        raise ValueError("Failed to parse valid JSON from response content") from e
+
+def _extract_json_object(content: str) -> Dict[str, Any]:
+    """Parses the outermost {...} block of free-form model output."""
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object found in response content")
+    try:
+        return json.loads(content[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError("Failed to parse JSON object from response content") from e
+
+
+def _trim_to_schema(instance: Any, schema: Dict[str, Any]) -> Any:
+    """Truncates arrays longer than their schema's maxItems, recursively."""
+    if isinstance(instance, dict) and schema.get("type") == "object":
+        properties = schema.get("properties", {})
+        return {
+            key: _trim_to_schema(value, properties[key]) if key in properties else value
+            for key, value in instance.items()
+        }
+    if isinstance(instance, list) and schema.get("type") == "array":
+        if "maxItems" in schema:
+            instance = instance[:schema["maxItems"]]
+        return [_trim_to_schema(item, schema.get("items", {})) for item in instance]
+    return instance
+
+
+def parse_structured_output(content: str, schema: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Parses a reasoning model's response and validates it against a JSON schema.
+
+    Tries extract_valid_json first, then the outermost JSON object in the content.
+    A parsed object that fails validation is repaired by trimming over-long arrays
+    and validated again.
+
+    Parameters:
+        content (str): The raw model response content.
+        schema (dict): The JSON schema the output must satisfy.
+
+    Returns:
+        tuple: (parsed object or None if no valid object could be produced,
+                whether a repair was needed)
+    """
+    repaired = False
+    try:
+        parsed = extract_valid_json(content)
+    except ValueError:
+        try:
+            parsed = _extract_json_object(content)
+            repaired = True
+        except ValueError:
+            return None, repaired
+
+    validator = Draft7Validator(schema)
+    if validator.is_valid(parsed):
+        return parsed, repaired
+
+    parsed = _trim_to_schema(parsed, schema)
+    if validator.is_valid(parsed):
+        return parsed, True
+    return None, True
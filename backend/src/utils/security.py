@@ -1,23 +1,115 @@
+import asyncio
+import hashlib
+import time
 import bcrypt
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from fastapi import HTTPException, status
 from typing import Dict, Any
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 from src.config.common_setting import settings
+from src.constants import TOKEN_CACHE_SIZE
+from src.utils.cache import LRUCache
 
 ALGORITHM = "HS256"
 
+def _hash_password(password: str) -> str:
+    salt = bcrypt.gensalt()
+    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
+    return hashed.decode("utf-8")  # Store as string
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread or process pool so hashing never blocks
+    the event loop. Requests beyond `workers + max_queue` are rejected with a 503."""
+
+    def __init__(self, executor: str = settings.PASSWORD_HASH_EXECUTOR,
+                 workers: int = settings.PASSWORD_HASH_WORKERS,
+                 max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE):
+        self.executor_type = executor
+        self.workers = workers
+        self.capacity = workers + max_queue
+        self._executor = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _submit(self, func, *args):
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly"
+            )
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            latency = time.perf_counter() - start
+            self.pending -= 1
+            self.completed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    async def hash_password(self, password: str) -> str:
+        return await self._submit(_hash_password, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify_password, plain_password, hashed_password)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "queue_depth": max(self.pending - self.workers, 0),
+            "in_flight": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(1000 * self.total_latency / self.completed, 2) if self.completed else 0.0,
+            "max_latency_ms": round(1000 * self.max_latency, 2),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+# sha256(token) -> verified claims, each entry expiring with its token
+token_claims_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE)
+
+
 class Security:
     def __init__(self):
         pass
 
     def hash_password(self, password: str) -> str:
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
-        return hashed.decode("utf-8")  # Store as string
+        return _hash_password(password)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+        return _verify_password(plain_password, hashed_password)
+
+    async def ahash_password(self, password: str) -> str:
+        return await password_hasher.hash_password(password)
+
+    async def averify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify_password(plain_password, hashed_password)
 
     def create_access_token(self, data: dict, expires_delta: timedelta = timedelta(days=1)):
         to_encode = data.copy()
@@ -33,8 +125,22 @@ class Security:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
-        except jwt.InvalidTokenError:
+        except jwt.JWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
+
+    def verify_token(self, token: str) -> Dict[str, Any]:
+        """decode_token, skipping the signature check for tokens already verified
+        by this process. Claims are cached until the token's exp; tokens without
+        an exp are verified on every call."""
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        claims = token_claims_cache.get(key)
+        if claims is None:
+            claims = self.decode_token(token)
+            expires_in = claims.get("exp", 0) - time.time()
+            if "exp" in claims and expires_in > 0:
+                token_claims_cache.set(key, claims, ttl=expires_in)
+        # callers get their own copy so they cannot alter the cached claims
+        return dict(claims)
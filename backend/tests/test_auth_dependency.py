@@ -0,0 +1,44 @@
+from bson import ObjectId
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from src.services import auth_service
+from src.services.auth_service import get_current_user
+from src.utils.security import Security
+
+class FakeUserCache:
+    def __init__(self, users):
+        self.users = users
+        self.reads = 0
+
+    async def get_user(self, user_id):
+        self.reads += 1
+        return self.users.get(user_id)
+
+def _client(monkeypatch, users):
+    cache = FakeUserCache(users)
+    monkeypatch.setattr(auth_service, "user_cache", cache)
+    app = FastAPI()
+
+    async def username(user=Depends(get_current_user)):
+        return user["username"]
+
+    @app.get("/me")
+    async def me(request: Request, user=Depends(get_current_user), name=Depends(username)):
+        return {"username": name, "same": user is request.state.user}
+
+    return TestClient(app), cache
+
+def test_resolves_the_token_user_once_per_request(monkeypatch):
+    user_id = str(ObjectId())
+    client, cache = _client(monkeypatch, {user_id: {"_id": ObjectId(user_id), "username": "ada"}})
+    token = Security().create_access_token({"sub": user_id})
+
+    response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == {"username": "ada", "same": True}
+    assert cache.reads == 1
+
+def test_rejects_missing_and_unknown_users(monkeypatch):
+    client, _ = _client(monkeypatch, {})
+    assert client.get("/me").status_code == 401
+    token = Security().create_access_token({"sub": str(ObjectId())})
+    assert client.get("/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
@@ -1,8 +1,32 @@
 import pytest
 from motor.motor_asyncio import AsyncIOMotorClient
 from src.config.common_setting import settings
-from src.database.mongo import db
+from src.database.mongo import db, hooks_collection, hooks_feed_collection, mongo, pool_stats
 
 @pytest.mark.asyncio
 async def test_mongo_connection():
     assert db is not None
+
+def test_collection_handles_follow_the_client_lifecycle():
+    first = hooks_collection.name
+    client = mongo.client
+    assert hooks_collection.database.client is client
+    mongo.close()
+    assert mongo.client is not client
+    assert hooks_collection.database.client is mongo.client
+    assert first == hooks_feed_collection.name == "hooks"
+    assert hooks_collection.read_preference.mongos_mode == "primary"
+    assert hooks_feed_collection._resolve().read_preference.mongos_mode == "secondaryPreferred"
+
+def test_pool_stats_track_checkouts():
+    class Event:
+        duration = 0.02
+    pool_stats.reset()
+    pool_stats.connection_created(Event())
+    pool_stats.connection_check_out_started(Event())
+    pool_stats.connection_checked_out(Event())
+    snapshot = pool_stats.snapshot()
+    assert (snapshot["open"], snapshot["in_use"], snapshot["waiting"], snapshot["checkouts"]) == (1, 1, 0, 1)
+    assert snapshot["max_wait_ms"] == 20.0
+    pool_stats.connection_checked_in(Event())
+    assert pool_stats.snapshot()["in_use"] == 0
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import pytest
+from bson import ObjectId
+from src.services.feed_pagination import decode_cursor, encode_cursor, page_query, stream_feed_page
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        pass
+
+def _get(doc, path):
+    for part in path.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+def _matches(doc, query):
+    """The subset of MongoDB query semantics page_query relies on"""
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, branch) for branch in condition):
+                return False
+            continue
+        value = _get(doc, field)
+        if isinstance(condition, dict) and "$in" in condition:
+            if not set(value or []) & set(condition["$in"]):
+                return False
+        elif isinstance(condition, dict) and "$lt" in condition:
+            if value is None or not value < condition["$lt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+def _sort_key(doc):
+    score = _get(doc, "metadata.popularity")
+    return (score is not None, score or 0, doc["_id"])
+
+class FakeHooks:
+    """Applies the keyset query and sort of stream_feed_page to an in-memory list"""
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection, sort, limit, batch_size):
+        docs = sorted((d for d in self.docs if _matches(d, query)), key=_sort_key, reverse=True)
+        return FakeCursor([{k: v for k, v in d.items() if k not in projection} for d in docs[:limit]])
+
+async def _page(collection, cursor, limit):
+    return json.loads("".join([chunk async for chunk in stream_feed_page(["art"], cursor, limit, collection)]))
+
+def test_cursor_round_trip_and_rejects_garbage():
+    hook_id = ObjectId()
+    assert decode_cursor(encode_cursor(1.5, hook_id)) == (1.5, hook_id)
+    assert decode_cursor(encode_cursor(None, hook_id)) == (None, hook_id)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+    assert "$or" not in page_query(["art"])
+
+def test_pages_cover_every_hook_once():
+    docs = [
+        {"_id": ObjectId(), "tags": ["art"], "metadata": {"popularity": i % 3}, "image_base64": "x" * 100}
+        for i in range(7)
+    ] + [
+        {"_id": ObjectId(), "tags": ["music"], "metadata": {"popularity": 9}},
+        {"_id": ObjectId(), "tags": ["art"], "metadata": {}},
+        {"_id": ObjectId(), "tags": ["art"], "metadata": {"popularity": None}},
+        {"_id": ObjectId(), "tags": ["art"]},
+    ]
+    collection = FakeHooks(docs)
+
+    seen, cursor = [], None
+    while True:
+        page = asyncio.run(_page(collection, cursor and decode_cursor(cursor), 3))
+        assert len(page["feed"]) <= 3
+        assert all("image_base64" not in hook for hook in page["feed"])
+        seen += [hook["_id"] for hook in page["feed"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    expected = sorted((d for d in docs if "art" in d["tags"]), key=_sort_key, reverse=True)
+    assert seen == [str(d["_id"]) for d in expected]
@@ -0,0 +1,56 @@
+import asyncio
+import random
+from bson import ObjectId
+from src.constants import QUIZ_INTERACTION_WINDOW
+from src.services import game
+from src.services.game import QUIZ_HOOK_PROJECTION, sample_quiz_hooks
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+class FakeHooks:
+    def __init__(self):
+        self.finds = []
+
+    def find(self, query, projection=None):
+        self.finds.append((query, projection))
+        return FakeCursor([{"_id": hook_id, "headline": str(hook_id)} for hook_id in query["_id"]["$in"]])
+
+def _stream(monkeypatch, hook_ids):
+    limits = []
+
+    async def recent_interactions(user_id, limit=None):
+        limits.append(limit)
+        for hook_id in hook_ids:
+            yield {"hook_id": hook_id}
+
+    hooks = FakeHooks()
+    monkeypatch.setattr(game, "recent_interactions", recent_interactions)
+    monkeypatch.setattr(game, "hooks_collection", hooks)
+    return hooks, limits
+
+def test_sample_quiz_hooks_reservoir_samples_distinct_valid_hooks(monkeypatch):
+    valid = [str(ObjectId()) for _ in range(20)]
+    hooks, limits = _stream(monkeypatch, valid + valid[:5] + ["not-an-id", None])
+
+    sample = asyncio.run(sample_quiz_hooks("user", 4, rng=random.Random(7)))
+    sampled = [str(hook["_id"]) for hook in sample]
+    assert len(sampled) == len(set(sampled)) == 4 and set(sampled) <= set(valid)
+    assert limits == [QUIZ_INTERACTION_WINDOW]
+    assert len(hooks.finds) == 1 and hooks.finds[0][1] == QUIZ_HOOK_PROJECTION
+
+    again = asyncio.run(sample_quiz_hooks("user", 4, rng=random.Random(7)))
+    assert [str(hook["_id"]) for hook in again] == sampled
+
+def test_sample_quiz_hooks_returns_every_hook_when_fewer_than_n(monkeypatch):
+    valid = [str(ObjectId()) for _ in range(3)]
+    hooks, _ = _stream(monkeypatch, valid + valid)
+    sample = asyncio.run(sample_quiz_hooks("user", 5, rng=random.Random(7)))
+    assert sorted(str(hook["_id"]) for hook in sample) == sorted(valid)
+
+    hooks, _ = _stream(monkeypatch, ["not-an-id"])
+    assert asyncio.run(sample_quiz_hooks("user", 5)) == [] and hooks.finds == []
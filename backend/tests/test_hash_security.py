@@ -1,7 +1,10 @@
+import asyncio
 import unittest
 from datetime import timedelta, datetime, timezone
 from jose import jwt
-from src.utils.security import Security, ALGORITHM
+from unittest import mock
+from fastapi import HTTPException
+from src.utils.security import Security, PasswordHasher, ALGORITHM, token_claims_cache
 from src.config.common_setting import settings
 
 class TestSecurity(unittest.TestCase):
@@ -14,6 +17,28 @@ class TestSecurity(unittest.TestCase):
         self.assertNotEqual(password, hashed)
         self.assertTrue(self.security.verify_password(password, hashed))
 
+    def test_async_hash_password(self):
+        password = "testpassword"
+        hashed = asyncio.run(self.security.ahash_password(password))
+        self.assertTrue(asyncio.run(self.security.averify_password(password, hashed)))
+        self.assertFalse(asyncio.run(self.security.averify_password("wrongpassword", hashed)))
+
+    def test_password_hasher_rejects_when_queue_full(self):
+        hasher = PasswordHasher(workers=1, max_queue=0)
+
+        async def burst():
+            return await asyncio.gather(
+                hasher.hash_password("first"),
+                hasher.hash_password("second"),
+                return_exceptions=True
+            )
+
+        results = asyncio.run(burst())
+        hasher.shutdown()
+        self.assertIsInstance(results[0], str)
+        self.assertEqual(getattr(results[1], "status_code", None), 503)
+        self.assertEqual(hasher.metrics()["rejected"], 1)
+
     def test_create_access_token(self):
         data = {"sub": "user123"}
         token = self.security.create_access_token(data)
@@ -22,5 +47,22 @@ class TestSecurity(unittest.TestCase):
         self.assertIn("exp", decoded)
         self.assertGreater(decoded["exp"], datetime.now(timezone.utc).timestamp())
 
+    def test_verify_token_caches_claims(self):
+        token_claims_cache.clear()
+        token = self.security.create_access_token({"sub": "user123"})
+        self.assertEqual(self.security.verify_token(token)["sub"], "user123")
+        with mock.patch("src.utils.security.jwt.decode") as decode:
+            claims = self.security.verify_token(token)
+            decode.assert_not_called()
+        claims["sub"] = "someone-else"
+        self.assertEqual(self.security.verify_token(token)["sub"], "user123")
+
+    def test_verify_token_rejects_bad_tokens(self):
+        expired = self.security.create_access_token({"sub": "user123"}, expires_delta=timedelta(seconds=-1))
+        for token in (expired, "not-a-token"):
+            with self.assertRaises(HTTPException) as ctx:
+                self.security.verify_token(token)
+            self.assertEqual(ctx.exception.status_code, 401)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+from src.services import hook_catalog as catalog_module
+from src.services.hook_catalog import HookCatalog
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+class FakeHookCollection:
+    def __init__(self, docs=(), failures=0):
+        self.docs = list(docs)
+        self.failures = failures
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("mongo is down")
+        ids = query.get("_id", {}).get("$in")
+        return FakeCursor([doc for doc in self.docs if ids is None or doc["_id"] in ids])
+
+    def watch(self, *args, **kwargs):
+        raise AutoReconnect("mongo is down")
+
+def _hook(*tags):
+    return {"_id": ObjectId(), "tags": list(tags), "metadata": {"viewCount": 1}}
+
+def test_apply_change_tracks_inserts_updates_and_deletes():
+    catalog = HookCatalog(collection=FakeHookCollection())
+    hook = _hook("space")
+    catalog._apply_change({"operationType": "insert", "fullDocument": hook})
+    catalog._apply_change({"operationType": "update", "fullDocument": {**hook, "tags": ["ocean"]}})
+    assert catalog.snapshot()[0]["tags"] == ["ocean"]
+
+    version = catalog._version
+    catalog._apply_change({"operationType": "delete", "documentKey": {"_id": ObjectId()}})
+    assert catalog._version == version
+    catalog._apply_change({"operationType": "delete", "documentKey": {"_id": hook["_id"]}})
+    assert len(catalog) == 0 and catalog._version == version + 1
+
+    catalog.put(_hook("art"))
+    catalog._apply_change({"operationType": "drop"})
+    assert len(catalog) == 0
+
+def test_get_many_fetches_only_missing_hooks():
+    cached, stored = _hook("space"), _hook("ocean")
+    collection = FakeHookCollection([stored])
+    catalog = HookCatalog(collection=collection)
+    catalog.put(cached)
+
+    hooks = asyncio.run(catalog.get_many([cached["_id"], stored["_id"], "not-an-id"]))
+    assert set(hooks) == {str(cached["_id"]), str(stored["_id"])}
+    assert collection.queries == [{"_id": {"$in": [stored["_id"]]}}]
+    assert str(stored["_id"]) in catalog._hooks
+
+def test_matrix_is_rebuilt_only_after_a_change(monkeypatch):
+    builds = []
+    monkeypatch.setattr(catalog_module, "HookMatrix", lambda hooks: builds.append(list(hooks)) or object())
+    catalog = HookCatalog(collection=FakeHookCollection())
+    catalog.put(_hook("space"))
+
+    first = catalog.matrix()
+    assert catalog.matrix() is first and len(builds) == 1
+    catalog.put(_hook("ocean"))
+    assert catalog.matrix() is not first and len(builds) == 2
+
+def test_start_keeps_reloading_until_mongo_is_back():
+    async def run():
+        collection = FakeHookCollection([_hook("space")], failures=3)
+        catalog = HookCatalog(collection=collection, poll_interval=0.001, max_backoff=0.005)
+        await catalog.start()
+        assert len(catalog) == 0
+        for _ in range(200):
+            if len(catalog):
+                break
+            await asyncio.sleep(0.005)
+        task = catalog._task
+        assert len(catalog) == 1 and not task.done()
+        await catalog.stop()
+
+    asyncio.run(run())
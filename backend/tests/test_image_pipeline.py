@@ -0,0 +1,128 @@
+import asyncio
+import base64
+import io
+from PIL import Image
+from src.constants import IMAGE_RENDITIONS
+from src.services.image_index import ImageIndex
+from src.services.image_pipeline import ImagePipeline, migrate_inline_images, render_renditions
+from src.services.image_store import FilesystemImageBackend, ImageStore
+
+def _png(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+class MemoryBackend:
+    def __init__(self):
+        self.saved = {}
+
+    def put(self, key, data, content_type):
+        self.saved[key] = (data, content_type)
+
+    def exists(self, key):
+        return key in self.saved
+
+    def url(self, key):
+        return f"/images/{key}"
+
+class FakeIndexCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+class FakeGemini:
+    def __init__(self, image_base64):
+        self.image_base64 = image_base64
+        self.calls = 0
+
+    async def aget_image(self, input):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.image_base64
+
+class FakeHookCollection:
+    def __init__(self, hooks):
+        self.hooks = hooks
+        self.updates = {}
+
+    async def _iterate(self):
+        for hook in self.hooks:
+            yield hook
+
+    def find(self, query, projection=None):
+        return self._iterate()
+
+    async def update_one(self, query, update):
+        self.updates[query["_id"]] = update
+
+def test_render_crops_square_images_to_16_9():
+    renditions = render_renditions(_png(1024, 1024))
+    assert set(renditions) == set(IMAGE_RENDITIONS)
+    for name, data in renditions.items():
+        image = Image.open(io.BytesIO(data))
+        assert image.format == "WEBP"
+        assert image.width <= IMAGE_RENDITIONS[name][0]
+        assert abs(image.width / image.height - 16 / 9) < 0.01
+
+def test_render_keeps_16_9_images_and_never_upscales():
+    renditions = render_renditions(_png(640, 360))
+    assert Image.open(io.BytesIO(renditions["full"])).size == (640, 360)
+    assert Image.open(io.BytesIO(renditions["thumb"])).size == (320, 180)
+
+def test_pipeline_uploads_every_rendition_once():
+    backend = MemoryBackend()
+    pipeline = ImagePipeline(store=ImageStore(backend), workers=1)
+    try:
+        image_url, srcset = asyncio.run(pipeline.process(_png(1280, 720)))
+        again = asyncio.run(pipeline.process(_png(1280, 720)))
+    finally:
+        pipeline.shutdown()
+    assert set(srcset) == set(IMAGE_RENDITIONS)
+    assert image_url == srcset["feed"]
+    assert again == (image_url, srcset)
+    assert len(backend.saved) == len(IMAGE_RENDITIONS)
+    assert all(content_type == "image/webp" for _, content_type in backend.saved.values())
+
+def test_store_deduplicates_identical_bytes(tmp_path):
+    store = ImageStore(FilesystemImageBackend(root=tmp_path, base_url="/images"))
+    first = asyncio.run(store.save(b"same bytes"))
+    second = asyncio.run(store.save(b"same bytes"))
+    assert first == second
+    assert (store.uploaded, store.deduplicated) == (1, 1)
+    assert len(list(tmp_path.iterdir())) == 1
+
+def test_index_skips_gemini_for_equivalent_prompts():
+    gemini = FakeGemini(base64.b64encode(_png(640, 360)).decode())
+    pipeline = ImagePipeline(store=ImageStore(MemoryBackend()), workers=1)
+    index = ImageIndex(collection=FakeIndexCollection(), pipeline=pipeline, reuse=True)
+
+    async def run():
+        first = await asyncio.gather(index.render("A red Sunset!", gemini), index.render("a red sunset", gemini))
+        later = await index.render("  A RED sunset. ", gemini)
+        return first, later
+
+    try:
+        (first, second), later = asyncio.run(run())
+    finally:
+        pipeline.shutdown()
+    assert gemini.calls == 1
+    assert first == second == later
+
+def test_inline_images_are_migrated_through_the_pipeline():
+    pipeline = ImagePipeline(store=ImageStore(MemoryBackend()), workers=1)
+    image_base64 = base64.b64encode(_png(320, 180)).decode()
+    collection = FakeHookCollection([{"_id": 1, "image_base64": image_base64}, {"_id": 2, "image_base64": ""}])
+    try:
+        assert asyncio.run(migrate_inline_images(pipeline, collection)) == 2
+    finally:
+        pipeline.shutdown()
+
+    migrated, empty = collection.updates[1], collection.updates[2]
+    assert set(migrated["$set"]["image_srcset"]) == set(IMAGE_RENDITIONS)
+    assert migrated["$set"]["image_url"] in migrated["$set"]["image_srcset"].values()
+    assert migrated["$unset"] == empty["$unset"] == {"image_base64": ""} and "$set" not in empty
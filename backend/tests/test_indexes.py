@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure, PyMongoError, ServerSelectionTimeoutError
+from src.config.common_setting import settings
+from src.database.indexes import INDEXES, ensure_indexes, is_index_backed, plan_stages, verify_hot_queries
+
+def test_plan_stages_walks_classic_and_sbe_plans():
+    classic = {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}}
+    sbe = {"queryPlanner": {"winningPlan": {"queryPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}}}
+    or_plan = {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {
+        "stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "IXSCAN"}]}}}}
+    assert plan_stages(classic) == {"FETCH", "IXSCAN"}
+    assert is_index_backed(classic) and is_index_backed(or_plan)
+    assert not is_index_backed(sbe)
+
+def test_profile_user_id_is_unique():
+    (profile,) = INDEXES["profile"]
+    assert profile.document["key"] == {"user_id": 1} and profile.document["unique"]
+
+def test_hot_queries_are_index_backed():
+    async def run():
+        client = AsyncIOMotorClient(settings.MONGO_DB_URI, serverSelectionTimeoutMS=500)
+        try:
+            await client.admin.command("ping")
+        except PyMongoError:
+            pytest.skip("MongoDB is not reachable")
+        database = client["hooked_index_check"]
+        try:
+            await ensure_indexes(database)
+            return await verify_hot_queries(database)
+        finally:
+            await client.drop_database("hooked_index_check")
+            client.close()
+
+    results = asyncio.run(run())
+    assert [name for name, backed in results.items() if not backed] == []
+
+def test_ensure_indexes_logs_conflicts_but_aborts_when_unreachable():
+    class FailingCollection:
+        def __init__(self, error):
+            self.error = error
+
+        async def create_indexes(self, models):
+            if self.error:
+                raise self.error
+
+    conflicting = {"a": FailingCollection(OperationFailure("conflict")), "b": FailingCollection(None)}
+    asyncio.run(ensure_indexes(conflicting, {"a": [], "b": []}))
+
+    unreachable = {"a": FailingCollection(ServerSelectionTimeoutError("down"))}
+    with pytest.raises(ServerSelectionTimeoutError):
+        asyncio.run(ensure_indexes(unreachable, {"a": []}))
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timezone
+from pymongo.errors import BulkWriteError
+from src.services import interaction_buffer as buffer_module
+from src.services.interaction_buffer import InteractionBuffer
+
+class FlakyCollection:
+    """Records applied bulk writes; fails the next `failures` calls"""
+    def __init__(self, name, failures=0, partial=False):
+        self.name = name
+        self.failures = failures
+        self.partial = partial
+        self.applied = []
+
+    async def bulk_write(self, ops, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            if self.partial:
+                self.applied.extend(ops[1:])
+                raise BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "dup"}]})
+            raise ConnectionError("network down")
+        self.applied.extend(ops)
+
+def _buffer(monkeypatch, buckets, profiles):
+    async def no_tags(user_ids):
+        return {}
+    monkeypatch.setattr(buffer_module, "fetch_explicit_tags", no_tags)
+    return InteractionBuffer(buckets=buckets, profiles=profiles)
+
+def _event(hook_id):
+    interaction = {"hook_id": hook_id, "action": "like", "duration": 5,
+                   "timestamp": datetime(2025, 6, 1, 9, tzinfo=timezone.utc), "implicit_tags": []}
+    hook = {"_id": hook_id, "tags": ["art"], "metadata": {"createdAt": "2025-06-01T00:00:00+00:00"}}
+    return interaction, hook
+
+def _pushed(collection):
+    return [i["hook_id"] for op in collection.applied for i in op._doc["$push"]["interactions"]["$each"]]
+
+def test_failed_bucket_write_is_retried(monkeypatch):
+    buckets, profiles = FlakyCollection("buckets", failures=1), FlakyCollection("profiles")
+    buffer = _buffer(monkeypatch, buckets, profiles)
+
+    async def run():
+        await buffer.add("u1", *_event("a"))
+        await buffer.add("u2", *_event("b"))
+        first = await buffer.flush()
+        pending = len(buffer)
+        return first, pending, await buffer.flush()
+
+    assert asyncio.run(run()) == (0, 2, 2)
+    assert sorted(_pushed(buckets)) == ["a", "b"]
+    assert len(profiles.applied) == 2
+
+def test_failed_profile_write_retries_only_the_profile(monkeypatch):
+    buckets, profiles = FlakyCollection("buckets"), FlakyCollection("profiles", failures=1, partial=True)
+    buffer = _buffer(monkeypatch, buckets, profiles)
+
+    async def run():
+        await buffer.add("u1", *_event("a"))
+        await buffer.add("u2", *_event("b"))
+        await buffer.flush()
+        await buffer.flush()
+
+    asyncio.run(run())
+    assert sorted(_pushed(buckets)) == ["a", "b"]
+    assert [op._filter["user_id"] for op in profiles.applied] == ["u2", "u1"]
+    assert len(buffer) == 0 and not buffer._pending_deltas
+
+def test_full_buffer_wakes_the_flusher_instead_of_writing_inline(monkeypatch):
+    buckets, profiles = FlakyCollection("buckets"), FlakyCollection("profiles")
+    buffer = _buffer(monkeypatch, buckets, profiles)
+    buffer.max_events, buffer.flush_interval = 2, 60
+
+    async def run():
+        await buffer.add("u1", *_event("a"))
+        await buffer.add("u1", *_event("b"))
+        inline = list(buckets.applied)
+        await buffer.start()
+        await asyncio.sleep(0.01)
+        woken = _pushed(buckets)
+        await buffer.stop()
+        return inline, woken
+
+    assert asyncio.run(run()) == ([], ["a", "b"])
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from src.constants import INTERACTION_BUCKET_SIZE
+from src.services.interaction_store import bucket_start, bucket_updates
+
+def test_bucket_start_floors_to_window():
+    ts = datetime(2025, 6, 1, 15, 30, tzinfo=timezone.utc)
+    assert bucket_start(ts) == datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+def test_bucket_updates_group_events_per_window():
+    events = [
+        {"hook_id": "a", "timestamp": datetime(2025, 6, 1, 9, tzinfo=timezone.utc)},
+        {"hook_id": "b", "timestamp": datetime(2025, 6, 1, 21, tzinfo=timezone.utc)},
+        {"hook_id": "c", "timestamp": datetime(2025, 6, 2, 1, tzinfo=timezone.utc)},
+    ]
+    updates = bucket_updates("user", events)
+    assert len(updates) == 2
+
+    op, pushed = updates[0]
+    first = op._doc
+    assert op._filter == {
+        "user_id": "user",
+        "bucket_start": datetime(2025, 6, 1, tzinfo=timezone.utc),
+        "count": {"$lte": INTERACTION_BUCKET_SIZE - 2},
+    }
+    assert first["$inc"] == {"count": 2}
+    assert first["$max"] == {"last_ts": events[1]["timestamp"]}
+    assert first["$push"]["interactions"]["$each"] == pushed
+    assert [e["hook_id"] for e in pushed] == ["a", "b"]
+
+def test_bucket_updates_never_overfill_a_bucket():
+    ts = datetime(2025, 6, 1, 9, tzinfo=timezone.utc)
+    events = [{"hook_id": str(i), "timestamp": ts} for i in range(5)]
+    updates = bucket_updates("user", events, size=2)
+    assert [len(pushed) for _, pushed in updates] == [2, 2, 1]
+    assert [op._filter["count"] for op, _ in updates] == [{"$lte": 0}, {"$lte": 0}, {"$lte": 1}]
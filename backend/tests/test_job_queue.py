@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from src.services.job_queue import JobQueue, public_job, retry_delay
+
+class FakeJobCollection:
+    def __init__(self):
+        self.queries = []
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.queries.append(query)
+        self.updates.append(update)
+
+def _job(attempts, max_attempts=3):
+    return {"_id": ObjectId(), "kind": "work", "payload": {"n": 2}, "status": "running",
+            "attempts": attempts, "max_attempts": max_attempts}
+
+def test_retry_delay_doubles():
+    assert [retry_delay(n, base=5) for n in (1, 2, 3)] == [5, 10, 20]
+
+def test_enqueue_rejects_unknown_kinds():
+    with pytest.raises(ValueError):
+        asyncio.run(JobQueue(collection=FakeJobCollection()).enqueue("missing"))
+
+def test_completed_job_records_result():
+    collection = FakeJobCollection()
+    queue = JobQueue(collection=collection)
+
+    @queue.handler("work")
+    async def work(payload, report):
+        await report(done=1)
+        return {"value": payload["n"] * 2}
+
+    asyncio.run(queue._run(_job(attempts=1)))
+    progress, finished = collection.updates
+    assert progress["$set"]["progress"] == {"done": 1}
+    assert finished["$set"]["status"] == "completed"
+    assert finished["$set"]["result"] == {"value": 4}
+    assert "active_key" in finished["$unset"]
+
+def test_failed_job_is_retried_then_failed():
+    collection = FakeJobCollection()
+    queue = JobQueue(collection=collection)
+
+    @queue.handler("work")
+    async def work(payload, report):
+        raise RuntimeError("boom")
+
+    asyncio.run(queue._run(_job(attempts=1)))
+    asyncio.run(queue._run(_job(attempts=3)))
+    retried, failed = collection.updates
+    assert retried["$set"]["status"] == "queued" and retried["$set"]["error"] == "boom"
+    assert failed["$set"]["status"] == "failed"
+    assert public_job({**_job(attempts=3), "status": "failed"})["status"] == "failed"
+
+def test_heartbeat_renews_the_lease_of_a_long_job():
+    collection = FakeJobCollection()
+    queue = JobQueue(collection=collection, lease=0.03)
+
+    @queue.handler("work")
+    async def work(payload, report):
+        await asyncio.sleep(0.05)
+        return "done"
+
+    job = _job(attempts=2)
+    asyncio.run(queue._run(job))
+    *renewals, finished = collection.updates
+    assert renewals and all(set(update["$set"]) == {"lease_until"} for update in renewals)
+    assert finished["$set"]["status"] == "completed"
+    assert all(query == {"_id": job["_id"], "attempts": 2} for query in collection.queries)
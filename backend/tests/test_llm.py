@@ -0,0 +1,61 @@
+import pytest
+from src.services import llm
+from src.services.llm import LLMClients
+from src.services.perplexity import PPLX
+
+
+class FakeChatModel:
+    """Local stand-in for a chat model: returns canned structured output"""
+
+    def __init__(self, model="sonar-pro", temperature=0, failures=0, **options):
+        self.model = model
+        self.failures = failures
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, input, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TimeoutError("simulated timeout")
+        return {"headline": "Fake hook", "input": input}
+
+
+@pytest.mark.asyncio
+async def test_override_swaps_provider_for_fake(monkeypatch):
+    clients = LLMClients()
+    clients.override("perplexity", FakeChatModel)
+    monkeypatch.setattr("src.services.perplexity.llm_clients", clients)
+
+    pplx = PPLX()
+    pplx.set_template(system_msg="system")
+    response = await pplx.aget_prompt(input="hello", schema={})
+
+    assert response["headline"] == "Fake hook"
+    assert pplx.chat is clients.get("perplexity", model=pplx.chat.model, temperature=1)
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr(llm, "LLM_RETRY_BASE_DELAY", 0)
+    clients = LLMClients()
+    fake = FakeChatModel(failures=2)
+
+    response = await clients.ainvoke("perplexity", fake, "prompt")
+
+    assert response["headline"] == "Fake hook"
+    assert fake.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_does_not_retry_other_errors():
+    class Broken(FakeChatModel):
+        async def ainvoke(self, input, **kwargs):
+            self.calls += 1
+            raise ValueError("bad schema")
+
+    broken = Broken()
+    with pytest.raises(ValueError):
+        await LLMClients().ainvoke("perplexity", broken, "prompt")
+    assert broken.calls == 1
@@ -0,0 +1,22 @@
+from src.utils.model import parse_structured_output
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "headline": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+    },
+    "required": ["headline", "tags"],
+}
+
+def test_valid_reasoning_output_is_used_directly():
+    content = '<think>planning</think>\n```json\n{"headline": "h", "tags": ["art"]}\n```'
+    assert parse_structured_output(content, SCHEMA) == ({"headline": "h", "tags": ["art"]}, False)
+
+def test_output_is_repaired_when_possible():
+    content = 'Sure! Here it is: {"headline": "h", "tags": ["art", "history", "music"]} Hope it helps.'
+    assert parse_structured_output(content, SCHEMA) == ({"headline": "h", "tags": ["art", "history"]}, True)
+
+def test_invalid_output_requires_fallback():
+    assert parse_structured_output('<think></think>{"tags": []}', SCHEMA) == (None, True)
+    assert parse_structured_output("no json here", SCHEMA) == (None, False)
@@ -0,0 +1,89 @@
+import asyncio
+import math
+import random
+from datetime import datetime, timedelta, timezone
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+from src.config.common_setting import settings
+from src.constants import DECAY_LAMBDA
+from src.services.mpad import apply_mmr, compact_profiles, jaccard_similarity, profile_update
+
+def reference_mmr(scored_hooks, N, lambda_param):
+    selected = []
+    candidates = [hook for _, hook in scored_hooks]
+    while len(selected) < N and candidates:
+        best_score, best_hook = float("-inf"), None
+        for hook in candidates:
+            rel_score = next(score for score, h in scored_hooks if h["_id"] == hook["_id"])
+            sim_score = max(
+                jaccard_similarity(hook.get("tags", []), other.get("tags", []))
+                for other in selected
+            ) if selected else 0
+            mmr_score = lambda_param * rel_score - (1 - lambda_param) * sim_score
+            if mmr_score > best_score:
+                best_score, best_hook = mmr_score, hook
+        selected.append(best_hook)
+        candidates = [c for c in candidates if c["_id"] != best_hook["_id"]]
+    return selected
+
+def test_apply_mmr_matches_jaccard_reference():
+    rng = random.Random(7)
+    vocab = ["art", "history", "science", "music", "memes", "sports", "movies"]
+    for _ in range(50):
+        hooks = [
+            {"_id": str(i), "tags": rng.sample(vocab, rng.randint(0, 4))}
+            for i in range(rng.randint(1, 40))
+        ]
+        scored = sorted(((round(rng.random(), 2), h) for h in hooks), key=lambda x: x[0], reverse=True)
+        N = rng.randint(1, len(hooks))
+        lambda_param = rng.choice([0.0, 0.3, 0.7, 1.0])
+        expected = [h["_id"] for h in reference_mmr(scored, N, lambda_param)]
+        assert [h["_id"] for h in apply_mmr(scored, N, lambda_param)] == expected
+
+def test_profile_update_scales_deltas_to_last_decayed():
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    op = profile_update("user", {"art": 2.0}, now)
+    assert op._filter == {"user_id": "user"} and op._upsert
+    stage = op._doc[0]["$set"]
+    assert stage["last_updated"] == now
+    assert stage["last_decayed"] == {"$ifNull": ["$last_decayed", now]}
+    added = stage["interest_vector.art"]["$add"]
+    assert added[0] == {"$ifNull": ["$interest_vector.art", 0]}
+    assert added[1]["$multiply"][0] == 2.0
+
+def test_compact_profiles_decays_every_profile_in_one_update():
+    class FakeProfiles:
+        async def update_many(self, query, pipeline):
+            self.call = (query, pipeline)
+            return type("Result", (), {"modified_count": 1})()
+
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    profiles = FakeProfiles()
+    asyncio.run(compact_profiles(collection=profiles, now=now))
+    query, pipeline = profiles.call
+    assert query == {}
+    assert pipeline[0]["$set"]["last_decayed"] == now
+    assert "$let" in pipeline[0]["$set"]["interest_vector"]
+
+def test_compaction_decays_late_deltas_only_from_their_arrival():
+    async def run():
+        client = AsyncIOMotorClient(settings.MONGO_DB_URI, serverSelectionTimeoutMS=500)
+        try:
+            await client.admin.command("ping")
+        except PyMongoError:
+            pytest.skip("MongoDB is not reachable")
+        profiles = client["hooked_mpad_check"]["profile"]
+        start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        try:
+            await profiles.bulk_write([profile_update("user", {"art": 1.0}, start)])
+            await profiles.bulk_write([profile_update("user", {"art": 1.0, "music": 1.0}, start + timedelta(days=5))])
+            await compact_profiles(collection=profiles, now=start + timedelta(days=10))
+            return (await profiles.find_one({"user_id": "user"}))["interest_vector"]
+        finally:
+            await client.drop_database("hooked_mpad_check")
+            client.close()
+
+    vector = asyncio.run(run())
+    assert vector["art"] == pytest.approx(math.exp(-DECAY_LAMBDA * 10) + math.exp(-DECAY_LAMBDA * 5))
+    assert vector["music"] == pytest.approx(math.exp(-DECAY_LAMBDA * 5))
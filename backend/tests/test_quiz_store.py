@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from src.services import quiz_store as quiz_store_module
+from src.services.quiz_store import QuizStore
+
+class FakeQuizCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return self.docs.get(query["hook_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs[query["hook_id"]] = dict(update["$set"])
+
+def _generator(monkeypatch):
+    calls = []
+
+    async def generate_quiz(hook):
+        calls.append(hook["_id"])
+        await asyncio.sleep(0.01)
+        return [{"question": f"about {hook['_id']} #{len(calls)}"}]
+
+    monkeypatch.setattr(quiz_store_module, "generate_quiz", generate_quiz)
+    return calls
+
+def test_concurrent_requests_share_one_generation(monkeypatch):
+    calls = _generator(monkeypatch)
+    collection = FakeQuizCollection()
+    store = QuizStore(collection=collection)
+
+    async def run():
+        return await asyncio.gather(*(store.get({"_id": "h1"}) for _ in range(5)))
+
+    quizzes = asyncio.run(run())
+    assert calls == ["h1"]
+    assert all(quiz == quizzes[0] for quiz in quizzes)
+    assert collection.docs["h1"]["quiz"] == quizzes[0] and not store._inflight
+
+def test_stored_quiz_is_served_from_mongo_then_memory(monkeypatch):
+    calls = _generator(monkeypatch)
+    stored = [{"question": "stored"}]
+    collection = FakeQuizCollection({"h1": {"quiz": stored, "generated_at": datetime.now(timezone.utc).isoformat()}})
+    store = QuizStore(collection=collection)
+
+    async def run():
+        return await store.get({"_id": "h1"}), await store.get({"_id": "h1"})
+
+    assert asyncio.run(run()) == (stored, stored)
+    assert collection.reads == 1 and calls == []
+
+def test_stale_quiz_is_served_while_refreshing(monkeypatch):
+    calls = _generator(monkeypatch)
+    stale = [{"question": "stale"}]
+    generated_at = datetime.now(timezone.utc) - timedelta(days=2)
+    collection = FakeQuizCollection({"h1": {"quiz": stale, "generated_at": generated_at}})
+    store = QuizStore(collection=collection, refresh_age=24 * 60 * 60)
+
+    async def run():
+        served = await store.get({"_id": "h1"})
+        refreshing = "h1" in store._inflight
+        await store._inflight["h1"]
+        return served, refreshing, await store.get({"_id": "h1"})
+
+    served, refreshing, fresh = asyncio.run(run())
+    assert served == stale and refreshing
+    assert calls == ["h1"] and fresh == [{"question": "about h1 #1"}]
@@ -0,0 +1,34 @@
+import numpy as np
+from datetime import datetime, timezone, timedelta
+from src.constants import WEIGHTS
+from src.services.scoring import HookMatrix
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+def make_hook(tags, days_old=0, views=0):
+    created = (NOW - timedelta(days=days_old)).isoformat() + "Z"
+    return {"tags": tags, "metadata": {"createdAt": created, "viewCount": views}}
+
+def test_base_scores_sum_interest_of_tags():
+    matrix = HookMatrix([make_hook(["art", "history"]), make_hook(["science"]), make_hook([])], now=NOW)
+    base = matrix.base_scores({"art": 1.5, "history": 2.0, "music": 9.0})
+    np.testing.assert_allclose(base, [3.5, 0.0, 0.0])
+
+def test_score_matches_weighted_formula():
+    hooks = [make_hook(["art"], days_old=14, views=50), make_hook(["history"], days_old=0, views=100)]
+    matrix = HookMatrix(hooks, now=NOW)
+    scores = matrix.score({"art": 2.0}, now=NOW, rng=np.random.default_rng(0))
+    exploration = np.random.default_rng(0).uniform(0.01, 0.1, size=2)
+    expected = (
+        WEIGHTS["base_score"] * np.array([2.0, 0.0]) +
+        WEIGHTS["recency"] * np.exp(-np.array([14, 0]) / 7) +
+        WEIGHTS["popularity"] * np.array([0.5, 1.0]) +
+        WEIGHTS["exploration_bonus"] * exploration
+    )
+    np.testing.assert_allclose(scores, expected)
+
+def test_top_k_returns_best_first():
+    scores = np.array([0.3, 0.9, 0.1, 0.7, 0.5])
+    assert HookMatrix.top_k(scores, 3).tolist() == [1, 3, 4]
+    assert HookMatrix.top_k(scores, 10).tolist() == [1, 3, 4, 0, 2]
+    assert HookMatrix.top_k(scores, 0).tolist() == []
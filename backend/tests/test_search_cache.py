@@ -0,0 +1,13 @@
+from src.services.search_cache import SearchCache, normalize_query, trigrams, trigram_similarity
+
+def test_normalize_query():
+    assert normalize_query("  Napoleon's   EMPIRE!! ") == "napoleon s empire"
+    assert normalize_query("???") == ""
+
+def test_near_duplicate_queries_match():
+    cache = SearchCache(collection=None, threshold=0.8)
+    cache.remember("Napoleon Bonaparte")
+    cache.remember("Roman empire")
+    assert cache._similar_queries(normalize_query("napoleon bonapart")) == ["napoleon bonaparte"]
+    assert cache._similar_queries(normalize_query("napoleon")) == []
+    assert trigram_similarity(trigrams("abc"), frozenset()) == 0.0
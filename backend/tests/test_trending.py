@@ -0,0 +1,94 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.routes import feed as feed_module
+from src.services.trending import TrendingLeaderboard
+
+class FakeCursor:
+    def __init__(self, collection, docs):
+        self.collection = collection
+        self.docs = docs
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        await self.collection.gate.wait()
+        return [dict(doc) for doc in self.docs]
+
+class FakeHookCollection:
+    def __init__(self, popularity):
+        self.docs = [{"_id": f"h{i}", "metadata": {"popularity": p}} for i, p in enumerate(popularity)]
+        self.finds = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    def find(self, query, sort=None, projection=None):
+        self.finds += 1
+        ranked = sorted(self.docs, key=lambda doc: doc["metadata"]["popularity"], reverse=True)
+        return FakeCursor(self, ranked)
+
+def test_get_caps_n_and_tags_each_n():
+    collection = FakeHookCollection([1, 5, 3, 4, 2])
+    leaderboard = TrendingLeaderboard(collection=collection, max_size=3, ttl=60)
+
+    async def run():
+        return await leaderboard.get(10), await leaderboard.get(2), await leaderboard.get(-1)
+
+    (top, top_etag), (two, two_etag), (none, _) = asyncio.run(run())
+    assert [hook["_id"] for hook in top] == ["h1", "h3", "h2"]
+    assert two == top[:2] and none == []
+    assert top_etag.endswith('-3"') and two_etag.endswith('-2"') and top_etag[:-3] == two_etag[:-3]
+    assert collection.finds == 1
+
+def test_stale_snapshot_is_served_while_refreshing():
+    collection = FakeHookCollection([1, 2])
+    leaderboard = TrendingLeaderboard(collection=collection, max_size=2, ttl=0)
+
+    async def run():
+        first, first_etag = await leaderboard.get(2)
+        collection.docs[0]["metadata"]["popularity"] = 9
+        collection.gate.clear()
+        stale, stale_etag = await leaderboard.get(2)
+        refresh = leaderboard._refresh_task
+        await leaderboard.get(2)
+        assert leaderboard._refresh_task is refresh and not refresh.done()
+        collection.gate.set()
+        await refresh
+        fresh, fresh_etag = await leaderboard.get(2)
+        return first, first_etag, stale, stale_etag, fresh, fresh_etag
+
+    first, first_etag, stale, stale_etag, fresh, fresh_etag = asyncio.run(run())
+    assert stale == first and stale_etag == first_etag
+    assert [hook["_id"] for hook in fresh] == ["h0", "h1"] and fresh_etag != first_etag
+
+class FakeLeaderboard:
+    def __init__(self):
+        self.requested = []
+
+    async def get(self, n):
+        self.requested.append(n)
+        return [{"_id": "h1"}], f'W/"abc-{n}"'
+
+def _client(monkeypatch):
+    leaderboard = FakeLeaderboard()
+    monkeypatch.setattr(feed_module, "trending_leaderboard", leaderboard)
+    app = FastAPI()
+    app.include_router(feed_module.router)
+    return TestClient(app), leaderboard
+
+def test_trending_route_sets_etag_and_answers_304(monkeypatch):
+    client, leaderboard = _client(monkeypatch)
+
+    response = client.post("/trending?N=3")
+    assert response.status_code == 200 and response.headers["etag"] == 'W/"abc-3"'
+    assert response.json() == {"feed": [{"_id": "h1"}]}
+
+    matching = client.post("/trending?N=3", headers={"If-None-Match": 'W/"old-3", W/"abc-3"'})
+    assert matching.status_code == 304 and matching.headers["etag"] == 'W/"abc-3"'
+    assert client.post("/trending?N=3", headers={"If-None-Match": "*"}).status_code == 304
+
+    other_n = client.post("/trending?N=4", headers={"If-None-Match": 'W/"abc-3"'})
+    assert other_n.status_code == 200 and other_n.headers["etag"] == 'W/"abc-4"'
+    assert leaderboard.requested == [3, 3, 3, 4]
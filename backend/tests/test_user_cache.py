@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from bson import ObjectId
+from src.services.user_cache import InProcessCacheTier, SharedCache, UserCache
+
+class FakeUsers:
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        doc = self.docs.get(query.get("_id", query.get("user_id")))
+        if doc is None:
+            return None
+        return {key: value for key, value in doc.items() if not projection or projection.get(key, 1)}
+
+def test_repeat_reads_hit_the_cache_until_invalidated():
+    user_id = ObjectId()
+    users = FakeUsers([{"_id": user_id, "username": "ada", "tags": ["art"], "password_hash": "secret"}])
+    cache = UserCache(users=users, profiles=FakeUsers([]))
+
+    async def run():
+        first = await cache.get_user(str(user_id))
+        first["tags"].append("mutated")
+        second = await cache.get_user(str(user_id))
+        users.docs[user_id]["tags"] = ["music"]
+        await cache.invalidate_user(str(user_id))
+        return first, second, await cache.get_user(str(user_id))
+
+    first, second, third = asyncio.run(run())
+    assert second == {"_id": user_id, "username": "ada", "tags": ["art"]}
+    assert first is not second and "password_hash" not in first
+    assert third["tags"] == ["music"]
+    assert users.reads == 2 and (cache.hits, cache.misses) == (1, 2)
+
+def test_shared_tier_serves_other_processes():
+    user_id = ObjectId()
+    created = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    users = FakeUsers([{"_id": user_id, "username": "ada", "last_login": created}])
+    shared = InProcessCacheTier()
+    writer = UserCache(users=users, profiles=FakeUsers([]), shared=shared)
+    reader = UserCache(users=users, profiles=FakeUsers([]), shared=shared)
+
+    async def run():
+        await writer.get_user(str(user_id))
+        cached = await reader.get_user(str(user_id))
+        await writer.invalidate_user(str(user_id))
+        return cached, await shared.get(f"user:{user_id}")
+
+    cached, after_invalidate = asyncio.run(run())
+    assert cached == {"_id": user_id, "username": "ada", "last_login": created}
+    assert after_invalidate is None
+    assert users.reads == 1
+
+def test_shared_cache_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SharedCache()